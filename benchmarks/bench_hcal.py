@@ -0,0 +1,115 @@
+"""
+Microbenchmarks for the holiday engine and the renderer.
+
+Each benchmark is a function taking no arguments that performs one
+operation; caches are cleared inside it so every run measures real work.
+"""
+import calendar
+import datetime
+import io
+
+import hcal_holidays
+from hcal_cli import display_multiple_months, display_year
+from hcal_holidays import clear_holiday_cache, get_holidays, get_specific_monday
+from hcal_util import HighlightCalendar, OutputBuffer, clear_month_cache
+
+BENCHMARKS = {}
+
+TODAY = datetime.date(2024, 6, 15)
+
+
+def benchmark(name):
+    """Registers a benchmark function under a name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def _calendar(julian=False, country=None):
+    """Returns a HighlightCalendar configured like the command line."""
+    return HighlightCalendar(calendar.SUNDAY, today=TODAY, country=country, julian=julian)
+
+
+def _render(display):
+    """Calls display(out) with a throwaway buffer and cold caches."""
+    clear_holiday_cache()
+    clear_month_cache()
+    out = OutputBuffer(io.StringIO())
+    display(out)
+    out.flush()
+
+
+@benchmark("get_holidays[2024]")
+def bench_get_holidays_year():
+    """Computes the holidays of a single year."""
+    clear_holiday_cache()
+    get_holidays('Japan', 2024)
+
+
+@benchmark("get_holidays[1955-2099]")
+def bench_get_holidays_span():
+    """Computes the holidays of every year from 1955 to 2099."""
+    clear_holiday_cache()
+    for year in range(1955, 2100):
+        get_holidays('Japan', year)
+
+
+@benchmark("get_holidays_range[1955-2099]")
+def bench_get_holidays_range():
+    """Computes the holidays from 1955 to 2099 in one batch."""
+    hcal_holidays.get_holidays_range('Japan', 1955, 2099)
+
+
+@benchmark("get_specific_monday")
+def bench_get_specific_monday():
+    """Finds the 2nd Monday of every month of a year."""
+    for month in range(1, 13):
+        get_specific_monday(2024, month, 2)
+
+
+@benchmark("formatmonth")
+def bench_formatmonth():
+    """Formats a month without holidays or Julian days."""
+    _calendar().formatmonth(2024, 5, w=2)
+
+
+@benchmark("formatmonth[julian]")
+def bench_formatmonth_julian():
+    """Formats a month with Julian days."""
+    _calendar(julian=True).formatmonth(2024, 5, w=3)
+
+
+@benchmark("formatmonth[country]")
+def bench_formatmonth_country():
+    """Formats a month with Japanese holidays."""
+    clear_holiday_cache()
+    _calendar(country='Japan').formatmonth(2024, 5, w=2)
+
+
+@benchmark("formatmonth[julian,country]")
+def bench_formatmonth_julian_country():
+    """Formats a month with Julian days and Japanese holidays."""
+    clear_holiday_cache()
+    _calendar(julian=True, country='Japan').formatmonth(2024, 5, w=3)
+
+
+@benchmark("display_year[-A 20]")
+def bench_display_year():
+    """Renders 21 consecutive years, like hcal -y 2000 -A 20."""
+    cal = _calendar(country='Japan')
+    _render(lambda out: display_year(cal, out, 2000, 20))
+
+
+@benchmark("display_multiple_months[-A 240]")
+def bench_display_multiple_months():
+    """Renders 241 consecutive months, like hcal -A 240."""
+    cal = _calendar(country='Japan')
+    _render(lambda out: display_multiple_months(cal, out, 2000, 1, 240))
+
+
+@benchmark("display_multiple_months[-j -A 240]")
+def bench_display_multiple_months_julian():
+    """Renders 241 consecutive months with Julian days."""
+    cal = _calendar(julian=True, country='Japan')
+    _render(lambda out: display_multiple_months(cal, out, 2000, 1, 240))
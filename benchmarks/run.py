@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Runs the hcal microbenchmarks and compares them with stored baselines.
+
+Usage:
+    python benchmarks/run.py --save          # run and store the results as the baseline
+    python benchmarks/run.py                 # run and compare with baseline.json
+    python benchmarks/run.py -k formatmonth  # run the benchmarks matching a substring
+
+Absolute speeds only mean something on the machine that measured them, so
+the baseline is not part of the repository: record it with --save on the
+host where you compare (for example on the base commit), then run the
+comparison there. Exits with status 1 when there is no baseline, or when a
+benchmark is slower (fewer ops/sec) or allocates more (higher peak memory)
+than its baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# pylint: disable=wrong-import-position
+from benchmarks.bench_hcal import BENCHMARKS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# Each repeat runs for at least this long; the best repeat is reported.
+MIN_REPEAT_SECONDS = 0.2
+REPEATS = 5
+
+
+def measure_speed(func):
+    """Returns the best ops/sec of func over several timed repeats."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_REPEAT_SECONDS:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+
+def measure_allocations(func):
+    """Returns the peak number of bytes allocated by one call of func."""
+    func()  # Import and warm up anything lazily initialized
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def run_benchmarks(pattern):
+    """Runs the benchmarks whose names contain pattern."""
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = {
+            'ops_per_sec': measure_speed(func),
+            'peak_bytes': measure_allocations(func),
+        }
+        print(f"{name:40} {results[name]['ops_per_sec']:12.1f} ops/sec "
+              f"{results[name]['peak_bytes'] / 1024:10.1f} KiB peak", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns the list of regressions of results against baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['ops_per_sec'] < expected['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: {result['ops_per_sec']:.1f} ops/sec, "
+                               f"baseline {expected['ops_per_sec']:.1f}")
+        if result['peak_bytes'] > expected['peak_bytes'] * (1 + threshold):
+            regressions.append(f"{name}: {result['peak_bytes']} bytes peak, "
+                               f"baseline {expected['peak_bytes']}")
+    return regressions
+
+
+def main():
+    """Parses arguments, runs the benchmarks and checks for regressions."""
+    parser = argparse.ArgumentParser(description="Run the hcal microbenchmarks")
+    parser.add_argument('-k', dest='pattern', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline file recorded on this machine '
+                             '(default: benchmarks/baseline.json)')
+    parser.add_argument('--save', action='store_true',
+                        help='Store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed relative regression (default: 0.25)')
+    args = parser.parse_args()
+
+    if not args.save and not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one on this machine with --save",
+              file=sys.stderr)
+        sys.exit(1)
+
+    # Keep a persisted holiday table from skewing the holiday benchmarks
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['XDG_CACHE_HOME'] = cache_dir
+        results = run_benchmarks(args.pattern)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
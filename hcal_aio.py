@@ -0,0 +1,140 @@
+"""
+Asyncio API of hcal: calendar renders and holiday queries as coroutines.
+
+Rendering and holiday computation are CPU-bound, so each call runs in the
+event loop's default executor (a thread pool), where it shares this
+process's holiday and month caches. Concurrent calls with identical
+arguments are single-flighted: the first one starts the work and the
+others await the same result, so many requests for the same month cost one
+computation.
+"""
+import asyncio
+import functools
+
+import hcal_cli
+import hcal_holidays
+
+# (loop, function name, arguments) -> future of the call in flight.
+_in_flight = {}
+
+
+async def _single_flight(key, func, *args):
+    """
+    Runs func(*args) in the default executor, joining an identical call in flight.
+
+    Args:
+        key (tuple): Hashable identity of the call.
+        func (callable): The blocking function to run.
+        *args: Its arguments.
+
+    Returns:
+        The result of func.
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop,) + key
+    future = _in_flight.get(key)
+    if future is None:
+        future = loop.run_in_executor(None, functools.partial(func, *args))
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # A cancelled caller must not cancel the work the others are waiting for
+    return await asyncio.shield(future)
+
+
+def _render_args(config, today, julian, highlight_today):
+    """Returns the argv flags and the hashable part of a render call's key."""
+    argv = []
+    if julian:
+        argv.append('-j')
+    if not highlight_today:
+        argv.append('-h')
+    config_key = None if config is None else tuple(sorted(config.items()))
+    return argv, (config_key, today)
+
+
+async def render_month(year, month, *, config=None, today=None, julian=False,
+                       highlight_today=True):
+    """
+    Renders one month, as `hcal MONTH YEAR` would.
+
+    Args:
+        year (int): The year.
+        month (int): The month (1-12).
+        config (dict): The configuration to use instead of reading ~/.hcalrc.
+        today (datetime.date): The date to treat as today (default: now).
+        julian (bool): Show days of the year, as with -j.
+        highlight_today (bool): Highlight today, unless False as with -h.
+
+    Returns:
+        str: The rendered month.
+
+    Raises:
+        ValueError: If month is not between 1 and 12.
+    """
+    # pylint: disable=too-many-arguments
+    if not 1 <= month <= hcal_cli.MONTHS_IN_YEAR:
+        raise ValueError(f"invalid month {month}")
+    argv, key = _render_args(config, today, julian, highlight_today)
+    argv = tuple(argv + [str(month), str(year)])
+    return await _single_flight(('render',) + key + argv, _render, argv, today, config)
+
+
+async def render_range(year, month=None, *, after=0, before=0, config=None, today=None,
+                       julian=False, highlight_today=True):
+    """
+    Renders several months or years, as `hcal -A AFTER -B BEFORE [MONTH] YEAR` would.
+
+    Args:
+        year (int): The year.
+        month (int): The first month, or None to start from the whole year.
+        after (int): The number of months to show after it (-A).
+        before (int): The number of months to show before it (-B).
+        config (dict): The configuration to use instead of reading ~/.hcalrc.
+        today (datetime.date): The date to treat as today (default: now).
+        julian (bool): Show days of the year, as with -j.
+        highlight_today (bool): Highlight today, unless False as with -h.
+
+    Returns:
+        str: The rendered calendar.
+
+    Raises:
+        ValueError: If month is not between 1 and 12 or a count is negative.
+    """
+    # pylint: disable=too-many-arguments
+    if month is not None and not 1 <= month <= hcal_cli.MONTHS_IN_YEAR:
+        raise ValueError(f"invalid month {month}")
+    if after < 0 or before < 0:
+        raise ValueError("after and before must not be negative")
+    argv, key = _render_args(config, today, julian, highlight_today)
+    argv += ['-A', str(after), '-B', str(before)]
+    if month is None:
+        argv += ['-y', str(year)]
+    else:
+        argv += [str(month), str(year)]
+    argv = tuple(argv)
+    return await _single_flight(('render',) + key + argv, _render, argv, today, config)
+
+
+def _render(argv, today, config):
+    """Renders argv to a string (runs in the executor)."""
+    return hcal_cli.render(list(argv), today=today, config=config)
+
+
+async def holidays(country, start_year, end_year=None):
+    """
+    Returns the named holidays of a country for a year or a span of years.
+
+    Args:
+        country (str): The name of the country (e.g., 'Japan').
+        start_year (int): The first year.
+        end_year (int): The last year (inclusive), default start_year.
+
+    Returns:
+        hcal_holidays.HolidayRecords: The holidays, shared between the
+        callers that awaited the same query.
+    """
+    if end_year is None:
+        end_year = start_year
+    return await _single_flight(('holidays', country.lower(), start_year, end_year),
+                                hcal_holidays.get_holiday_records, country, start_year,
+                                end_year)
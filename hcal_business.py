@@ -0,0 +1,101 @@
+"""
+Business-day arithmetic built on the holiday rules of hcal_holidays.
+"""
+import bisect
+import datetime
+from array import array
+from itertools import accumulate
+
+from hcal_holidays import HolidaySpan, get_holidays_range
+
+SATURDAY = 5
+SUNDAY = 6
+
+
+class BusinessCalendar(HolidaySpan):
+    """
+    Business-day arithmetic over a span of years.
+
+    Weekends and the holidays of the country (including substitute and
+    Citizens' Holidays) are non-working days. Cumulative working-day counts
+    are precomputed for every day of the span, so counting takes constant
+    time and offsetting takes a single binary search.
+    """
+
+    def __init__(self, country, start_year, end_year):
+        """
+        Initializes the BusinessCalendar.
+
+        Args:
+            country (str): The country for holiday calculations, or None for
+                weekends only.
+            start_year (int): The first year covered.
+            end_year (int): The last year covered (inclusive).
+        """
+        super().__init__(country, start_year, end_year)
+        holidays = set(get_holidays_range(country, start_year, end_year)) if country else set()
+        # _counts[i] is the number of business days in [first, first + i)
+        flags = ((ordinal + 6) % 7 < SATURDAY and ordinal not in holidays
+                 for ordinal in range(self._first, self._last + 1))
+        self._counts = array('i', accumulate(flags, initial=0))
+
+    def _index(self, date):
+        """Returns the offset of a date within the span."""
+        return self._to_ordinal(date) - self._first
+
+    def is_business_day(self, date):
+        """
+        Returns True if the date is neither a weekend nor a holiday.
+
+        Args:
+            date (datetime.date): The date to check.
+        """
+        index = self._index(date)
+        return self._counts[index + 1] > self._counts[index]
+
+    def business_days_between(self, start, end):
+        """
+        Returns the number of business days from start (inclusive) to end (exclusive).
+
+        The result is negative when end is before start.
+
+        Args:
+            start (datetime.date): The first date.
+            end (datetime.date): The date after the last one counted.
+
+        Returns:
+            int: The number of business days.
+        """
+        return self._counts[self._index(end)] - self._counts[self._index(start)]
+
+    def add_business_days(self, date, days):
+        """
+        Returns the date a number of business days away from date.
+
+        Positive values move forward and negative values backward; zero
+        returns the date unchanged.
+
+        Args:
+            date (datetime.date): The starting date.
+            days (int): The number of business days to move.
+
+        Returns:
+            datetime.date: The resulting business day.
+
+        Raises:
+            ValueError: If the result falls outside the covered years.
+        """
+        index = self._index(date)
+        if days > 0:
+            target = self._counts[index + 1] + days
+            result = bisect.bisect_left(self._counts, target) - 1
+        elif days < 0:
+            target = self._counts[index] + days
+            result = bisect.bisect_right(self._counts, target) - 1 if target >= 0 else -1
+        else:
+            return date
+
+        if not 0 <= result < len(self._counts) - 1:
+            raise ValueError(f"{days} business days from {date} is outside the years "
+                             f"{self.start_year}-{self.end_year}")
+        return datetime.date.fromordinal(self._first + result)
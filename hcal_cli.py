@@ -0,0 +1,714 @@
+"""
+Command-line interface of hcal: argument parsing and calendar layout.
+"""
+
+import calendar
+import datetime
+import io
+import os
+import sys
+import time
+import types
+from itertools import groupby
+from hcal_util import HighlightCalendar, OutputBuffer, read_config
+
+
+MONTHS_IN_YEAR = 12
+MONTHS_PER_ROW = 3
+SPACES_BETWEEN_MONTHS = 2
+
+CONFIG_PATH = "~/.hcalrc"
+
+# Environment variable naming the socket of a running hcal daemon.
+SOCKET_ENV = "HCAL_SOCKET"
+STATS_LOG_ENV = "HCAL_STATS_LOG"
+
+# Values of every option when not given, as produced by build_parser().
+DEFAULT_ARGS = {
+    'no_highlight': False,
+    'three_months': False,
+    'after': 0,
+    'before': 0,
+    'year_option': None,
+    'julian': False,
+    'warm_cache': None,
+    'business_days': None,
+    'output': None,
+    'flush': 'auto',
+    'serve': None,
+    'http': None,
+    'jobs': 1,
+    'profile': False,
+    'profile_dump': None,
+    'stats': False,
+    'list_year': None,
+    'export_ics': False,
+    'from_year': None,
+    'to_year': None,
+    'format': 'text',
+    'month': None,
+    'year': None,
+}
+
+# Flags handled without building the argparse parser, and the option each sets.
+FAST_FLAGS = {'-3': 'three_months', '-h': 'no_highlight', '-j': 'julian'}
+
+
+def get_month_lines(cal, year, month):
+    """Returns a list of padded strings for the month."""
+    return cal.month_lines(year, month)
+
+
+def add_months(year, month, delta):
+    """Calculates a new year and month given a delta."""
+    m_new = month + delta
+    y_new = year + (m_new - 1) // MONTHS_IN_YEAR
+    m_new = (m_new - 1) % MONTHS_IN_YEAR + 1
+    return y_new, m_new
+
+
+def iter_months(year, month, count_before, count_after):
+    """Yields the (year, month) pairs from count_before months before to count_after after."""
+    curr_y, curr_m = add_months(year, month, -count_before)
+    for _ in range(count_before + 1 + count_after):
+        yield curr_y, curr_m
+        curr_y, curr_m = add_months(curr_y, curr_m, 1)
+
+
+def selected_months(args, year, month):
+    """
+    Returns the (year, month) pairs selected by the parsed arguments.
+
+    This is the same selection the text layout displays: one month, -3,
+    -A/-B around a month, or whole years (-y, optionally with -A/-B).
+    """
+    if month is None:
+        return iter_months(year, 1, args.before, MONTHS_IN_YEAR - 1 + args.after)
+    count_before = max(1 if args.three_months else 0, args.before)
+    count_after = max(1 if args.three_months else 0, args.after)
+    return iter_months(year, month, count_before, count_after)
+
+
+def pad_height(lines, height, width):
+    """Pads a list of lines with empty lines to match the specified height."""
+    while len(lines) < height:
+        lines.append(' ' * width)
+    return lines
+
+
+def print_month_list(cal, out, month_list):
+    """Prints a list of (year, month) pairs in rows of 3."""
+    for i in range(0, len(month_list), MONTHS_PER_ROW):
+        chunk = month_list[i:i + MONTHS_PER_ROW]
+
+        # Get lines for each month in chunk
+        block_lines = [get_month_lines(cal, y, m) for y, m in chunk]
+
+        # Normalize height
+        max_h = max(len(lines) for lines in block_lines)
+
+        # Pad all months to max_h
+        block_lines = [pad_height(lines, max_h, cal.month_width) for lines in block_lines]
+
+        # Print the block
+        for row in range(max_h):
+            # Join month lines with 2 spaces
+            out.line("  ".join(block_lines[col][row] for col in range(len(chunk))))
+
+        # Add empty line between blocks of months, but not after the last block
+        if i + MONTHS_PER_ROW < len(month_list):
+            out.line()
+        out.end_block()
+
+
+def write_year_group(cal, out, group):
+    """Writes the year header and the months of one year group."""
+    total_width = (cal.month_width * MONTHS_PER_ROW +
+                   SPACES_BETWEEN_MONTHS * (MONTHS_PER_ROW - 1))
+    out.line(str(group[0][0]).center(total_width))
+    out.line()
+    print_month_list(cal, out, group)
+
+
+def calendar_settings(cal):
+    """Returns the HighlightCalendar arguments needed to recreate cal in a worker."""
+    return {
+        'firstweekday': cal.firstweekday,
+        'today': cal.today,
+        'country': cal.country,
+        'highlight_today': cal.highlight_today,
+        'holiday_color': cal.holiday_color,
+        'julian': cal.julian,
+    }
+
+
+def render_year_group(settings, group):
+    """
+    Renders one year group to a string.
+
+    Runs in worker processes, each with its own calendar and caches.
+
+    Returns:
+        tuple: The rendered text and the --stats counters of the work done
+        (see hcal_stats.since), which the worker cannot report itself.
+    """
+    import hcal_stats  # pylint: disable=import-outside-toplevel
+
+    before = hcal_stats.snapshot()
+    buffer = io.StringIO()
+    out = OutputBuffer(buffer)
+    write_year_group(HighlightCalendar(**settings), out, group)
+    out.flush()
+    counters = hcal_stats.since(before)
+    # The parent process writes the text, and counts its bytes, itself
+    del counters['bytes_written']
+    return buffer.getvalue(), counters
+
+
+def render_year_groups_parallel(cal, year_groups, jobs):
+    """
+    Yields the rendered year groups, in order, from a pool of worker processes.
+
+    The counters of the workers are added to those reported by --stats.
+    """
+    # Imported here so that serial invocations do not pay for it
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    import hcal_stats  # pylint: disable=import-outside-toplevel
+
+    settings = calendar_settings(cal)
+    chunksize = max(1, len(year_groups) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for text, counters in executor.map(render_year_group, [settings] * len(year_groups),
+                                           year_groups, chunksize=chunksize):
+            hcal_stats.add_worker_counters(counters)
+            yield text
+
+
+def display_grouped_years(cal, out, month_list, jobs=1):
+    """
+    Displays months grouped by year with headers.
+
+    With jobs > 1, the year groups are rendered by that many worker
+    processes and written out in order; the output is identical.
+    """
+    year_groups = [list(g) for _, g in groupby(month_list, key=lambda item: item[0])]
+    if jobs > 1 and len(year_groups) > 1:
+        rendered = render_year_groups_parallel(cal, year_groups, jobs)
+    else:
+        rendered = None
+
+    for i, group in enumerate(year_groups):
+        if rendered is not None:
+            out.write(next(rendered))
+            out.end_block()
+        else:
+            write_year_group(cal, out, group)
+        if i < len(year_groups) - 1:
+            out.line()
+            out.line()
+
+
+def display_multiple_months(cal, out, year, month, count_after, count_before=0,
+                            show_year_headers=False, jobs=1):
+    """Displays a range of months, 3 per row."""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # Calculate all (year, month) pairs to display
+    month_list = list(iter_months(year, month, count_before, count_after))
+
+    if not show_year_headers:
+        print_month_list(cal, out, month_list)
+    else:
+        display_grouped_years(cal, out, month_list, jobs)
+
+
+def display_year(cal, out, year, extra_years=0, before_years=0, jobs=1):
+    """Displays the whole year calendar with 3 months per row."""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    start_year = year - before_years
+    total_years = before_years + 1 + extra_years
+    month_list = [(start_year + i, month)
+                  for i in range(total_years)
+                  for month in range(1, MONTHS_IN_YEAR + 1)]
+    display_grouped_years(cal, out, month_list, jobs)
+
+
+def parse_year_range(text):
+    """Parses a START-END year range argument."""
+    import argparse  # pylint: disable=import-outside-toplevel
+    try:
+        start, end = (int(part) for part in text.split('-', 1))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid year range: '{text}'") from error
+    if start > end:
+        raise argparse.ArgumentTypeError(f"invalid year range: '{text}'")
+    return start, end
+
+
+def parse_address(text):
+    """Parses a HOST:PORT address argument."""
+    import argparse  # pylint: disable=import-outside-toplevel
+    host, _, port = text.rpartition(':')
+    if not host or not port.isdigit() or int(port) > 65535:
+        raise argparse.ArgumentTypeError(f"invalid address: '{text}'")
+    return host, int(port)
+
+
+def positive_int(text):
+    """Parses a positive integer argument."""
+    import argparse  # pylint: disable=import-outside-toplevel
+    try:
+        value = int(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: '{text}'") from error
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: '{text}'")
+    return value
+
+
+def parse_date(text):
+    """Parses a YYYY-MM-DD date argument."""
+    import argparse  # pylint: disable=import-outside-toplevel
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid date: '{text}'") from error
+
+
+def infer_year_month(args, now):
+    """Infers the year and month to display based on arguments."""
+    year = args.year
+    month = args.month
+
+    if args.year_option is not None:
+        if args.year_option == -1:
+            year = now.year
+        else:
+            year = args.year_option
+        month = None
+    elif args.month is not None and args.year is None:
+        if args.month > MONTHS_IN_YEAR:
+            year = args.month
+            month = None  # Show whole year
+        else:
+            year = now.year
+            month = args.month
+    elif args.month is None and args.year is None:
+        year = now.year
+        month = now.month
+    return year, month
+
+
+def export_years(args, now):
+    """Returns the (first, last) years selected by --from and --to."""
+    start_year = args.from_year if args.from_year is not None else now.year
+    end_year = args.to_year if args.to_year is not None else start_year
+    return start_year, end_year
+
+
+def write_holiday_list(out, country, year):
+    """
+    Writes one line per holiday of a year: the date, the weekday and the name.
+
+    Args:
+        out (OutputBuffer): The buffer receiving the list.
+        country (str): The name of the country (e.g., 'Japan').
+        year (int): The year to list.
+    """
+    import hcal_holidays  # pylint: disable=import-outside-toplevel
+    for holiday in hcal_holidays.get_holiday_records(country, year, year):
+        date = holiday.date
+        out.line(f"{date.isoformat()}  {calendar.day_abbr[date.weekday()]}  {holiday.name}")
+
+
+def parse_fast(argv):
+    """
+    Parses the common invocations made only of the -3, -h and -j flags.
+
+    Returns:
+        types.SimpleNamespace or None: The arguments, or None if argv needs
+        the full parser.
+    """
+    if len(set(argv)) != len(argv) or any(arg not in FAST_FLAGS for arg in argv):
+        return None
+    values = dict(DEFAULT_ARGS)
+    for arg in argv:
+        values[FAST_FLAGS[arg]] = True
+    return types.SimpleNamespace(**values)
+
+
+def parse_args(argv):
+    """Parses command-line arguments, building the argparse parser only when needed."""
+    args = parse_fast(argv)
+    if args is None:
+        args = build_parser().parse_args(argv)
+    return args
+
+
+def build_parser():
+    """Builds the command-line argument parser."""
+    # argparse is only imported when the fast path does not apply
+    import argparse  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(prog="hcal", description="Show calendar on terminal",
+                                     add_help=False)
+    parser.add_argument('--help', action='help', default=argparse.SUPPRESS,
+                        help='show this help message and exit')
+    parser.add_argument('-h', action='store_true', dest='no_highlight',
+                        help="Disable highlighting of today's date")
+    parser.add_argument('-3', action='store_true', dest='three_months',
+                        help='Display previous, current and next month')
+    parser.add_argument('-A', '--after', type=int, default=0,
+                        help='Display specific numbers of months '
+                             'after the current month (or year)')
+    parser.add_argument('-B', '--before', type=int, default=0,
+                        help='Display specific numbers of months '
+                             'before the current month (or year)')
+    parser.add_argument('-y', dest='year_option', type=int, nargs='?', const=-1,
+                        help='Display a calendar for the specified year (default: current year)')
+    parser.add_argument('-j', action='store_true', dest='julian',
+                        help='Display Julian days (day of year)')
+    parser.add_argument('--warm-cache', type=parse_year_range, metavar='START-END',
+                        help='Prefill the on-disk holiday cache for a range of years')
+    parser.add_argument('--business-days', type=parse_date, nargs=2, metavar=('FROM', 'TO'),
+                        help='Count business days from FROM (inclusive) to TO (exclusive)')
+    parser.add_argument('--list', dest='list_year', type=int, nargs='?', const=-1,
+                        metavar='YEAR',
+                        help='List the holidays of YEAR (default: current year) by name')
+    parser.add_argument('--export-ics', action='store_true',
+                        help='Write the holidays of the years --from..--to as iCalendar')
+    parser.add_argument('--from', type=int, dest='from_year', metavar='YEAR',
+                        help='First year to export (default: current year)')
+    parser.add_argument('--to', type=int, dest='to_year', metavar='YEAR',
+                        help='Last year to export (default: the --from year)')
+    parser.add_argument('--format', choices=('text', 'html', 'json', 'jsonl', 'csv'),
+                        default='text',
+                        help='Output the calendar as an HTML page, or the selected days '
+                             'as records')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='Write the calendar to FILE instead of standard output')
+    parser.add_argument('--flush', choices=('auto', 'block', 'end'), default='auto',
+                        help='When to write output: after every block of months, only '
+                             'at the end, or auto (per block on a terminal, else at the end)')
+    parser.add_argument('--jobs', type=positive_int, default=1, metavar='N',
+                        help='Render multi-year calendars with N worker processes')
+    parser.add_argument('--profile', action='store_true',
+                        help='Report the wall time of each phase to stderr')
+    parser.add_argument('--profile-dump', metavar='FILE',
+                        help='With --profile, also write cProfile statistics to FILE')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print work counters as JSON to stderr')
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='Run as a daemon answering render requests on a Unix socket')
+    parser.add_argument('--http', type=parse_address, metavar='HOST:PORT',
+                        help='Run an HTTP service answering render and holiday requests')
+    parser.add_argument('month', type=int, nargs='?', help="Month number (1-12)")
+    parser.add_argument('year', type=int, nargs='?', help="Year (e.g. 2023)")
+    return parser
+
+
+def _run_warm_cache(args, config, now, out):
+    """Handles --warm-cache: precomputes the holiday table of the configured country."""
+    # pylint: disable=unused-argument
+    country = config.get('country')
+    if not country:
+        print("hcal: --warm-cache requires a country in ~/.hcalrc", file=sys.stderr)
+        return
+    import hcal_holiday_store  # pylint: disable=import-outside-toplevel
+    try:
+        out.line(hcal_holiday_store.warm(country, *args.warm_cache))
+    except hcal_holiday_store.HolidayStoreError as error:
+        print(f"hcal: {error}", file=sys.stderr)
+
+
+def _run_business_days(args, config, now, out):
+    """Handles --business-days: counts the business days between two dates."""
+    # pylint: disable=unused-argument
+    from hcal_business import BusinessCalendar  # pylint: disable=import-outside-toplevel
+    country = config.get('country')
+    if not country:
+        print("hcal: warning: no country in ~/.hcalrc, only weekends are excluded",
+              file=sys.stderr)
+    start, end = args.business_days
+    engine = BusinessCalendar(country, min(start, end).year, max(start, end).year)
+    out.line(str(engine.business_days_between(start, end)))
+
+
+def _run_list(args, config, now, out):
+    """Handles --list: lists the holidays of a year."""
+    country = config.get('country')
+    if not country:
+        print("hcal: --list requires a country in ~/.hcalrc", file=sys.stderr)
+        return
+    list_year = now.year if args.list_year == -1 else args.list_year
+    if not datetime.MINYEAR <= list_year <= datetime.MAXYEAR:
+        print(f"hcal: invalid year {list_year}", file=sys.stderr)
+        return
+    write_holiday_list(out, country, list_year)
+
+
+def _run_export_ics(args, config, now, out):
+    """Handles --export-ics: writes the holidays of --from to --to as iCalendar."""
+    country = config.get('country')
+    if not country:
+        print("hcal: --export-ics requires a country in ~/.hcalrc", file=sys.stderr)
+        return
+    start_year, end_year = export_years(args, now)
+    if not datetime.MINYEAR <= start_year <= end_year <= datetime.MAXYEAR:
+        print(f"hcal: invalid year range {start_year}-{end_year}", file=sys.stderr)
+        return
+    import hcal_ics  # pylint: disable=import-outside-toplevel
+    hcal_ics.write_ics(out, country, start_year, end_year, now)
+
+
+# Options that replace the calendar, in order of precedence, and their handlers.
+_OPTION_HANDLERS = (
+    ('warm_cache', _run_warm_cache),
+    ('business_days', _run_business_days),
+    ('list_year', _run_list),
+    ('export_ics', _run_export_ics),
+)
+
+
+def _run_records(args, config, now, out, month_list):
+    """Handles --format json, jsonl and csv: writes one record per day of the months."""
+    import hcal_records  # pylint: disable=import-outside-toplevel
+    hcal_records.write_records(out, args.format, month_list, config.get('country'), now.date())
+
+
+def _run_html(cal, out, args, year, month):
+    """Handles --format html: writes the selected months as an HTML page."""
+    import hcal_html  # pylint: disable=import-outside-toplevel
+    hcal_html.write_html(cal, out, list(selected_months(args, year, month)),
+                         show_year_headers=month is None)
+
+
+def _run_text(cal, out, args, year, month):
+    """Displays the selected months as text, the default."""
+    if month is None:
+        if args.after > 0 or args.before > 0:
+            display_multiple_months(cal, out, year, 1, MONTHS_IN_YEAR - 1 + args.after,
+                                    args.before, show_year_headers=True, jobs=args.jobs)
+        else:
+            display_year(cal, out, year, args.after, args.before, jobs=args.jobs)
+
+    elif args.three_months or args.after > 0 or args.before > 0:
+        count_before = max(1 if args.three_months else 0, args.before)
+        count_after = max(1 if args.three_months else 0, args.after)
+        display_multiple_months(cal, out, year, month, count_after, count_before)
+
+    else:
+        out.line(cal.formatmonth(year, month, w=cal.formatmonth_w))
+
+
+# --format values rendered from a calendar, and their handlers. The other
+# formats are written by _run_records.
+_CALENDAR_FORMATS = {
+    'text': _run_text,
+    'html': _run_html,
+}
+
+
+def _get_calendar(args, config, now, calendars):
+    """Returns the calendar rendering args, reusing the one cached in calendars if any."""
+    key = (args.julian, args.no_highlight, args.format)
+    cal = calendars.get(key) if calendars is not None else None
+    if cal is None:
+        if args.format == 'html':
+            from hcal_html import HtmlCalendar  # pylint: disable=import-outside-toplevel
+            calendar_class = HtmlCalendar
+        else:
+            calendar_class = HighlightCalendar
+        cal = calendar_class(calendar.SUNDAY, today=now.date(), country=config.get('country'),
+                             highlight_today=not args.no_highlight,
+                             holiday_color=config.get('holiday_color', 'red'),
+                             julian=args.julian)
+        if calendars is not None:
+            calendars[key] = cal
+    return cal
+
+
+def run(args, config, now, out, calendars=None):
+    """
+    Displays the calendar selected by the parsed arguments into out.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments (or the equivalent
+            types.SimpleNamespace from parse_fast).
+        config (dict): The configuration read from ~/.hcalrc.
+        now (datetime.datetime): The current time.
+        out (OutputBuffer): The buffer receiving the output.
+        calendars (dict): Optional cache of HighlightCalendar instances to
+            reuse across calls; they must all share the same config and day.
+    """
+    for option, handler in _OPTION_HANDLERS:
+        value = getattr(args, option)
+        if value is not None and value is not False:
+            handler(args, config, now, out)
+            return
+
+    year, month = infer_year_month(args, now)
+    if month is None and args.three_months:
+        print("hcal: -3 option not valid with year", file=sys.stderr)
+        return
+
+    display = _CALENDAR_FORMATS.get(args.format)
+    if display is None:
+        _run_records(args, config, now, out, selected_months(args, year, month))
+        return
+    display(_get_calendar(args, config, now, calendars), out, args, year, month)
+
+
+def forward_to_daemon(socket_path, argv):
+    """
+    Lets a running daemon render argv and exits with its status.
+
+    Returns without doing anything if the daemon is unreachable or asks for
+    the request to be handled in-process.
+    """
+    import hcal_daemon  # pylint: disable=import-outside-toplevel
+
+    status = hcal_daemon.forward(socket_path, argv)
+    if status is not None:
+        sys.exit(status)
+
+
+def write_output(args, config, now, stream, calendars=None):
+    """
+    Runs the parsed arguments, writing to stream or to the --output file.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        config (dict): The configuration read from ~/.hcalrc.
+        now (datetime.datetime): The current time.
+        stream (io.TextIOBase): The stream used when --output is not given.
+        calendars (dict): Optional cache of HighlightCalendar instances (see run).
+    """
+    if args.output:
+        try:
+            stream = open(args.output, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+        except OSError as error:
+            print(f"hcal: cannot write {args.output}: {error.strerror}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.flush == 'auto':
+        flush_blocks = stream.isatty()
+    else:
+        flush_blocks = args.flush == 'block'
+
+    out = OutputBuffer(stream, flush_blocks=flush_blocks)
+    try:
+        run(args, config, now, out, calendars)
+        out.flush()
+    finally:
+        if args.output:
+            stream.close()
+
+
+def render(argv, today=None, config=None, stream=None):
+    """
+    Runs the hcal command line in-process.
+
+    This is the library entry point: it goes through the same argument
+    parsing, configuration and layout as the hcal command without starting
+    a new interpreter.
+
+    Args:
+        argv (list): The command-line arguments, without the program name.
+        today (datetime.date): The date to treat as today (default: now).
+        config (dict): The configuration to use instead of reading ~/.hcalrc.
+        stream (io.TextIOBase): Where to write the output. When omitted the
+            output is returned as a string.
+
+    Returns:
+        str or None: The output, or None if it was written to stream.
+
+    Raises:
+        SystemExit: If argv is invalid (after printing usage to stderr) or
+            asks for --help, exactly as on the command line.
+        ValueError: If argv asks for --serve or --http, or for the
+            --profile, --profile-dump or --stats reports, which only the
+            command line writes.
+    """
+    args = parse_args(list(argv))
+    if args.serve or args.http:
+        raise ValueError("--serve and --http cannot be used with render()")
+    if args.profile or args.profile_dump or args.stats:
+        raise ValueError("--profile, --profile-dump and --stats cannot be used with render()")
+
+    if today is None:
+        now = datetime.datetime.now()
+    elif isinstance(today, datetime.datetime):
+        now = today
+    else:
+        now = datetime.datetime.combine(today, datetime.time())
+
+    if config is None:
+        config = read_config(CONFIG_PATH)
+
+    if stream is not None:
+        write_output(args, config, now, stream)
+        return None
+
+    buffer = io.StringIO()
+    write_output(args, config, now, buffer)
+    return buffer.getvalue()
+
+
+def main(argv=None):
+    """
+    Main function to parse arguments and display the calendar.
+
+    Args:
+        argv (list): The command-line arguments (default: sys.argv[1:]).
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    socket_path = os.environ.get(SOCKET_ENV)
+    if socket_path:
+        forward_to_daemon(socket_path, argv)
+
+    parse_started = time.perf_counter()
+    args = parse_args(argv)
+    parse_seconds = time.perf_counter() - parse_started
+
+    if args.serve:
+        # Imported here so that plain invocations do not pay for it
+        import hcal_daemon  # pylint: disable=import-outside-toplevel
+
+        hcal_daemon.serve(args.serve)
+        return
+
+    if args.http:
+        import hcal_http  # pylint: disable=import-outside-toplevel
+
+        hcal_http.serve(args.http)
+        return
+
+    def run_main():
+        now = datetime.datetime.now()
+
+        # Read config
+        config = read_config(CONFIG_PATH)
+
+        write_output(args, config, now, sys.stdout)
+
+    if args.profile or args.profile_dump:
+        import hcal_profile  # pylint: disable=import-outside-toplevel
+
+        def run_invocation():
+            hcal_profile.profile_main(args, parse_seconds, run_main)
+    else:
+        run_invocation = run_main
+
+    stats_log = os.environ.get(STATS_LOG_ENV)
+    if args.stats or stats_log:
+        import hcal_stats  # pylint: disable=import-outside-toplevel
+
+        hcal_stats.stats_main(args, argv, stats_log, run_invocation)
+    else:
+        run_invocation()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Daemon mode for hcal: renders served over a Unix socket.
+
+A long-lived `hcal --serve SOCKET` process keeps the configuration, the
+calendars and the holiday and month caches warm. Clients send their argv as
+one JSON line and receive the rendered output as one JSON line.
+"""
+import contextlib
+import datetime
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+
+import hcal_cli
+from hcal_util import read_config
+
+# Maximum size of a request line.
+MAX_REQUEST_BYTES = 64 * 1024
+
+CONNECT_TIMEOUT = 1.0
+RESPONSE_TIMEOUT = 30.0
+
+# Options whose effects must happen in the client's own process.
+LOCAL_OPTIONS = ('output', 'warm_cache', 'serve', 'http', 'profile', 'profile_dump', 'stats')
+
+
+class DaemonState:
+    """
+    Configuration, today's date and calendars kept warm between requests.
+    """
+
+    def __init__(self, config_path=hcal_cli.CONFIG_PATH):
+        """
+        Initializes the DaemonState.
+
+        Args:
+            config_path (str): The configuration file to watch.
+        """
+        self.config_path = os.path.expanduser(config_path)
+        self.parser = hcal_cli.build_parser()
+        self.config = {}
+        self.config_mtime = None
+        self.config_loaded = False
+        self.today = None
+        self.calendars = {}
+
+    def refresh(self, now):
+        """
+        Drops cached state at midnight and when the config file changes.
+
+        Args:
+            now (datetime.datetime): The current time.
+        """
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if not self.config_loaded or mtime != self.config_mtime:
+            self.config = read_config(self.config_path)
+            self.config_mtime = mtime
+            self.config_loaded = True
+            self.calendars.clear()
+
+        if now.date() != self.today:
+            self.today = now.date()
+            self.calendars.clear()
+
+    def render(self, argv):
+        """
+        Renders argv as the command line would.
+
+        Args:
+            argv (list): The command-line arguments, without the program name.
+
+        Returns:
+            dict: The response, with stdout, stderr and status, or with
+            fallback set if the client must handle the request itself.
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = 0
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                args = self.parser.parse_args(argv)
+                if any(getattr(args, name) for name in LOCAL_OPTIONS):
+                    return {'fallback': True}
+
+                now = datetime.datetime.now()
+                self.refresh(now)
+                hcal_cli.write_output(args, self.config, now, stdout, self.calendars)
+            except SystemExit as error:
+                status = exit_status(error)
+        return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'status': status}
+
+
+def exit_status(error):
+    """Returns the process status corresponding to a SystemExit."""
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers a single JSON render request."""
+
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_BYTES)
+        if not line:
+            # A liveness probe that connected and hung up
+            return
+        try:
+            argv = json.loads(line)['argv']
+            if not all(isinstance(arg, str) for arg in argv):
+                raise TypeError('argv must be a list of strings')
+        except (ValueError, KeyError, TypeError):
+            response = {'fallback': True}
+        else:
+            response = self.server.state.render(argv)
+        with contextlib.suppress(BrokenPipeError):
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    A Unix socket server rendering requests with a shared DaemonState.
+    """
+
+    def __init__(self, socket_path, state):
+        """
+        Initializes the DaemonServer.
+
+        Args:
+            socket_path (str): The path of the socket to listen on.
+            state (DaemonState): The state shared by all requests.
+        """
+        self.state = state
+        # Only the owner may talk to the daemon
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+
+def _is_listening(socket_path):
+    """Returns True if a process accepts connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def listen(create, address):
+    """
+    Creates a server, exiting with an error message if it cannot listen.
+
+    Args:
+        create (callable): Returns the server, raising OSError on failure.
+        address (str): The address listened on, for the error message.
+
+    Returns:
+        socketserver.BaseServer: The server.
+    """
+    try:
+        return create()
+    except OSError as error:
+        print(f"hcal: cannot listen on {address}: {error.strerror}", file=sys.stderr)
+        sys.exit(1)
+
+
+def run_server(server):
+    """
+    Serves requests until interrupted or terminated, then closes the server.
+
+    Args:
+        server (socketserver.BaseServer): The server.
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve(socket_path):
+    """
+    Runs the daemon on a Unix socket until interrupted or terminated.
+
+    Args:
+        socket_path (str): The path of the socket to listen on.
+    """
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            print(f"hcal: a daemon is already listening on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        # Left behind by a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    server = listen(lambda: DaemonServer(socket_path, DaemonState()), socket_path)
+    try:
+        run_server(server)
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(socket_path)
+
+
+def forward(socket_path, argv):
+    """
+    Sends argv to a running daemon and writes its output.
+
+    Args:
+        socket_path (str): The path of the daemon's socket.
+        argv (list): The command-line arguments, without the program name.
+
+    Returns:
+        int or None: The exit status, or None if the daemon is unreachable
+        or the request must be rendered in-process.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.sendall(json.dumps({'argv': argv}).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as reader:
+                response = json.loads(reader.readline())
+    except (OSError, ValueError):
+        return None
+
+    if response.get('fallback'):
+        return None
+    sys.stdout.write(response['stdout'])
+    sys.stdout.flush()
+    sys.stderr.write(response['stderr'])
+    return response['status']
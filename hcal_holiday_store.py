@@ -0,0 +1,232 @@
+"""
+Persistent on-disk holiday table shared across hcal processes.
+
+The table holds one fixed-size bitmap per year (bit N set means day-of-year
+N + 1 is a holiday) behind a small header, so readers can memory-map the file
+and look a year up by offset without parsing anything. Importing this
+module registers lookup() with hcal_holidays, which then consults the table
+before computing a year.
+"""
+import datetime
+import mmap
+import os
+import struct
+
+import hcal_holidays
+
+MAGIC = b'HCAL'
+FORMAT_VERSION = 1
+
+# magic, format version, rules version, country, source size,
+# source mtime (ns), first year, number of years
+HEADER = struct.Struct('<4sHH16sQQii')
+BYTES_PER_YEAR = 46  # 366 bits, rounded up to whole bytes
+
+# Upper bound on the size of a single table file (roughly 2800 years).
+MAX_STORE_BYTES = 128 * 1024
+
+MIN_YEAR = datetime.MINYEAR
+MAX_YEAR = datetime.MAXYEAR
+
+# country -> (mmap, first year, number of years), or None if unusable
+_open_tables = {}
+
+
+class HolidayStoreError(Exception):
+    """Raised when the holiday table cannot be written."""
+
+
+def get_store_dir():
+    """
+    Returns the directory holding the holiday tables.
+
+    Honours XDG_CACHE_HOME and falls back to ~/.cache/hcal.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join('~', '.cache')
+    return os.path.join(os.path.expanduser(base), 'hcal')
+
+
+def get_store_path(country):
+    """
+    Returns the table path for a country.
+
+    The rule-set version is part of the file name, so a release with new
+    holiday rules never opens a table written by an older one.
+    """
+    name = f"holidays-{country.lower()}-r{hcal_holidays.RULES_VERSION}.bin"
+    return os.path.join(get_store_dir(), name)
+
+
+def _source_fingerprint():
+    """Returns (size, mtime_ns) of the module defining the holiday rules."""
+    try:
+        stat = os.stat(hcal_holidays.__file__)
+    except OSError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _encode_country(country):
+    """Returns the fixed-width header field for a country name."""
+    return country.lower().encode('ascii', 'replace')[:16].ljust(16, b'\0')
+
+
+def _header_fields(country):
+    """
+    Returns the header fields identifying a table written by this code.
+
+    Returns:
+        tuple: Every HEADER field before the first year, as unpacked.
+    """
+    return ((MAGIC, FORMAT_VERSION, hcal_holidays.RULES_VERSION, _encode_country(country)) +
+            _source_fingerprint())
+
+
+def _encode_year(country, year):
+    """Returns the holiday bitmap for one year."""
+    bitmap = bytearray(BYTES_PER_YEAR)
+    jan_1 = datetime.date(year, 1, 1).toordinal()
+    for month, day in hcal_holidays.get_holidays(country, year):
+        index = datetime.date(year, month, day).toordinal() - jan_1
+        bitmap[index >> 3] |= 1 << (index & 7)
+    return bytes(bitmap)
+
+
+def _decode_year(bitmap, year):
+    """Returns the (month, day) holidays encoded in a year bitmap."""
+    holidays = set()
+    jan_1 = datetime.date(year, 1, 1).toordinal()
+    for byte_index, byte in enumerate(bitmap):
+        while byte:
+            bit = (byte & -byte).bit_length() - 1
+            byte &= byte - 1
+            date = datetime.date.fromordinal(jan_1 + byte_index * 8 + bit)
+            holidays.add((date.month, date.day))
+    return frozenset(holidays)
+
+
+def _open_table(country):
+    """Maps a country's table into memory, returning None if it is unusable."""
+    path = get_store_path(country)
+    try:
+        with open(path, 'rb') as table_file:
+            table = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(table) < HEADER.size:
+        table.close()
+        return None
+
+    *fields, start_year, year_count = HEADER.unpack_from(table)
+    if (tuple(fields) != _header_fields(country) or
+            len(table) != HEADER.size + year_count * BYTES_PER_YEAR):
+        # Written by different holiday rules (or truncated): ignore it.
+        table.close()
+        return None
+
+    return table, start_year, year_count
+
+
+def lookup(country, year):
+    """
+    Returns the stored holidays for a country and year.
+
+    Args:
+        country (str): The lower-cased country name.
+        year (int): The year.
+
+    Returns:
+        frozenset or None: The (month, day) holidays, or None if the year is
+        not covered by a valid table.
+    """
+    if country not in _open_tables:
+        _open_tables[country] = _open_table(country)
+    entry = _open_tables[country]
+    if entry is None:
+        return None
+
+    table, start_year, year_count = entry
+    index = year - start_year
+    if not 0 <= index < year_count:
+        return None
+    offset = HEADER.size + index * BYTES_PER_YEAR
+    return _decode_year(table[offset:offset + BYTES_PER_YEAR], year)
+
+
+# Consulted by hcal_holidays.get_holidays once this module is imported.
+hcal_holidays.set_holiday_store(lookup)
+
+
+def close_tables():
+    """Unmaps every open table so the next lookup re-reads the files."""
+    for entry in _open_tables.values():
+        if entry is not None:
+            entry[0].close()
+    _open_tables.clear()
+
+
+def _remove_stale_tables(country, keep_path):
+    """Deletes tables for the same country written by other rule versions."""
+    prefix = f"holidays-{country.lower()}-r"
+    store_dir = os.path.dirname(keep_path)
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name.startswith(prefix) and name.endswith('.bin') and path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+
+def warm(country, start_year, end_year):
+    """
+    Writes the holiday table for a country covering start_year..end_year.
+
+    The file is written to a temporary name and atomically renamed, so
+    concurrent readers always see either the old or the new complete table.
+
+    Args:
+        country (str): The country name (e.g., 'Japan').
+        start_year (int): The first year to store.
+        end_year (int): The last year to store (inclusive).
+
+    Returns:
+        str: The path of the written table.
+
+    Raises:
+        HolidayStoreError: If the range is invalid, too large or cannot be written.
+    """
+    if not MIN_YEAR <= start_year <= end_year <= MAX_YEAR:
+        raise HolidayStoreError(f"invalid year range {start_year}-{end_year}")
+
+    year_count = end_year - start_year + 1
+    if HEADER.size + year_count * BYTES_PER_YEAR > MAX_STORE_BYTES:
+        max_years = (MAX_STORE_BYTES - HEADER.size) // BYTES_PER_YEAR
+        raise HolidayStoreError(f"year range too large (at most {max_years} years)")
+
+    header = HEADER.pack(*_header_fields(country), start_year, year_count)
+    body = b''.join(_encode_year(country, year)
+                    for year in range(start_year, end_year + 1))
+
+    # Only needed when writing, which is rare
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    path = get_store_path(country)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as table_file:
+                table_file.write(header)
+                table_file.write(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+        _remove_stale_tables(country, path)
+    except OSError as error:
+        raise HolidayStoreError(f"cannot write {path}: {error}") from error
+
+    close_tables()
+    return path
@@ -1,7 +1,37 @@
 """
 Module for calculating holidays.
+
+Holidays are described as data: each country has a table of HolidayRule
+entries (fixed dates, nth weekdays and equinox days, each with a range
+of valid years and optional one-off overrides) plus its bridge and
+substitute holiday policies. A table is compiled once into a per-year
+evaluator, so adding a country means adding a table. get_holiday_records
+returns the same holidays with their names and kinds, stored compactly.
 """
+import bisect
+import calendar
+import collections
 import datetime
+import functools
+import sys
+from array import array
+
+from hcal_util import DAYS_BEFORE_MONTH
+
+# Number of (country, year) holiday sets kept by the LRU cache. A 200-year
+# multi-year render stays well inside this bound.
+HOLIDAY_CACHE_SIZE = 256
+
+# Holidays are computed for this many consecutive years at a time, in one
+# sweep, and kept in a cache of HOLIDAY_CACHE_SIZE // HOLIDAY_BLOCK_YEARS blocks.
+HOLIDAY_BLOCK_YEARS = 8
+
+# Version of the holiday rules below. Bump it whenever a rule changes so that
+# persisted holiday tables written by older rules are ignored.
+RULES_VERSION = 2
+
+# Work counters reported by `hcal --stats` (see hcal_stats).
+COUNTERS = {'holiday_lookups': 0, 'holiday_computations': 0, 'holiday_store_hits': 0}
 
 
 def get_specific_monday(year, month, ordinal):
@@ -31,249 +61,902 @@ def get_specific_monday(year, month, ordinal):
     return specific_monday_day
 
 
-def _get_japan_fixed_holidays(year):
-    """Returns a set of fixed date holidays for Japan."""
-    holidays = set()
-    if year >= 1955:
-        holidays.add((1, 1))  # New Year's Day
-        holidays.add((5, 3))  # Constitution Memorial Day
-        holidays.add((5, 5))  # Children's Day
-        holidays.add((11, 3))  # Culture Day
-        holidays.add((11, 23))  # Labor Thanksgiving Day
+# Kinds of HolidayRule.
+FIXED = 'fixed'
+NTH_WEEKDAY = 'nth_weekday'
+EQUINOX = 'equinox'
+
+HolidayRule = collections.namedtuple(
+    'HolidayRule', 'name kind month value first_year last_year overrides')
+HolidayRule.__doc__ = """
+A single holiday definition.
+
+Attributes:
+    name (str): The name of the holiday.
+    kind (str): FIXED, NTH_WEEKDAY or EQUINOX.
+    month (int): The month the holiday falls in.
+    value: The day of the month (FIXED), a (weekday, nth) pair
+        (NTH_WEEKDAY) or None (EQUINOX).
+    first_year (int): The first year the rule applies, or None.
+    last_year (int): The last year the rule applies, or None.
+    overrides (tuple): (year, month, day) dates replacing the rule in
+        single years.
+"""
 
-    if year >= 1967:
-        holidays.add((2, 11))  # National Foundation Day
+CountryRules = collections.namedtuple('CountryRules', 'rules bridge_from substitute_from')
+CountryRules.__doc__ = """
+The holiday rules of a country.
 
-    if year >= 2007:
-        holidays.add((4, 29))  # Showa Day
+Both policies are enabled from an explicit first year (datetime.MINYEAR
+for every year) and disabled with None.
 
-    return holidays
+Attributes:
+    rules (tuple): The HolidayRule entries.
+    bridge_from (int): First year in which a non-Sunday between two
+        holidays is a holiday itself, or None for never.
+    substitute_from (int): First year in which a holiday falling on a
+        Sunday moves to the next non-holiday, or None for never.
+"""
 
 
-def _get_coming_of_age_day(year):
-    """Returns Coming of Age Day."""
-    if year >= 2000:
-        return (1, get_specific_monday(year, 1, 2))
-    return (1, 15)
+def fixed(name, month, day, first_year=None, last_year=None, overrides=()):
+    """Returns a rule for a holiday on the same date every year."""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    return HolidayRule(name, FIXED, month, day, first_year, last_year, overrides)
+
+
+def nth_weekday(name, month, weekday, nth, first_year=None, last_year=None, overrides=()):
+    """Returns a rule for a holiday on the nth given weekday of a month."""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    return HolidayRule(name, NTH_WEEKDAY, month, (weekday, nth), first_year, last_year,
+                       overrides)
+
+
+def equinox(name, month, first_year=None, last_year=None):
+    """Returns a rule for the day of the equinox of a month (see equinox_day)."""
+    return HolidayRule(name, EQUINOX, month, None, first_year, last_year, ())
+
+
+# Span of the precomputed equinox table.
+EQUINOX_TABLE_START = 1900
+EQUINOX_TABLE_END = 2300
+
+# Day of the month of the March and September equinoxes in Japan Standard
+# Time, one digit per year from EQUINOX_TABLE_START, added to the base day.
+# Computed with Meeus' equinox algorithm (Astronomical Algorithms, ch. 27)
+# and the Espenak-Meeus delta T polynomials.
+_EQUINOX_DIGITS = {
+    3: (19,
+        '22232223222322232223222322222222222222222222222222'  # 1900-1949
+        '22222222221222122212221222122212221222122211221122'  # 1950-1999
+        '11221122112211221122112211121112111211121112111211'  # 2000-2049
+        '12111211111111111111111111111111111111111101110111'  # 2050-2099
+        '12221222122212221222122211221122112211221122112211'  # 2100-2149
+        '22112211121112111211121112111211121112111111111111'  # 2150-2199
+        '22222222222222222222222212221222122212221222122212'  # 2200-2249
+        '22122211221122112211221122112211221122111211121112'  # 2250-2299
+        '2'),                                                 # 2300
+    9: (22,
+        '12221222122212221122112211221122112211221122112211'  # 1900-1949
+        '12111211121112111211121112111211111111111111111111'  # 1950-1999
+        '11111111111101110111011101110111011101110111001100'  # 2000-2049
+        '11001100110011001100110011000100010001000100010001'  # 2050-2099
+        '11121111111111111111111111111111111111110111011101'  # 2100-2149
+        '11011101110111011100110011001100110011001100110011'  # 2150-2199
+        '11121112111211121112111211121111111111111111111111'  # 2200-2249
+        '11111111111111011101110111011101110111011100110011'  # 2250-2299
+        '1'),                                                 # 2300
+}
+
+# month -> one byte per year: the day of the month of the equinox.
+EQUINOX_DAYS = {month: bytes(base + digit - ord('0') for digit in digits.encode('ascii'))
+                for month, (base, digits) in _EQUINOX_DIGITS.items()}
+
+# The traditional approximation, int(constant + 0.242194 * (year - 1980)) -
+# (year - 1980) // 4, as (first year, last year, constant). It only covers
+# years inside the table and serves as an independent check of it: the two
+# agree except in September 1917 and 2107, when the equinox falls minutes
+# before midnight.
+EQUINOX_FORMULAS = {
+    3: ((1900, 1979, 20.8357), (1980, 2099, 20.8431), (2100, 2150, 21.8510)),
+    9: ((1900, 1979, 23.2588), (1980, 2099, 23.2488), (2100, 2150, 24.2488)),
+}
+
+
+def equinox_formula_day(month, year):
+    """Returns the equinox day of the month from EQUINOX_FORMULAS, or None (see above)."""
+    for first_year, last_year, constant in EQUINOX_FORMULAS[month]:
+        if first_year <= year <= last_year:
+            return int(constant + 0.242194 * (year - 1980)) - (year - 1980) // 4
+    return None
 
 
-def _get_emperor_birthday(year):
-    """Returns Emperor's Birthday."""
-    if 1955 <= year <= 1988:
-        return (4, 29)
-    if 1989 <= year <= 2018:
-        return (12, 23)
-    if year >= 2020:
-        return (2, 23)
-    return None
+def equinox_day(month, year):
+    """
+    Returns the day of the month of the March or September equinox in Japan.
 
+    Args:
+        month (int): 3 or 9.
+        year (int): The year.
 
-def _get_marine_day(year):
-    """Returns Marine Day (Sea Day)."""
-    if 1996 <= year <= 2002:
-        return (7, 20)
-    if year >= 2003:
-        if year == 2020:
-            return (7, 23)
-        if year == 2021:
-            return (7, 22)
-        return (7, get_specific_monday(year, 7, 3))
+    Returns:
+        int or None: The day from EQUINOX_DAYS, or None if the year is
+        outside EQUINOX_TABLE_START to EQUINOX_TABLE_END.
+    """
+    if EQUINOX_TABLE_START <= year <= EQUINOX_TABLE_END:
+        return EQUINOX_DAYS[month][year - EQUINOX_TABLE_START]
     return None
 
 
-def _get_greenery_day(year):
-    """Returns Greenery Day."""
-    if 1989 <= year <= 2006:
-        return (4, 29)
-    if year >= 2007:
-        return (5, 4)
-    return None
+JAPAN_RULES = CountryRules(
+    rules=(
+        fixed("New Year's Day", 1, 1, first_year=1955),
+        fixed("Coming of Age Day", 1, 15, last_year=1999),
+        nth_weekday("Coming of Age Day", 1, calendar.MONDAY, 2, first_year=2000),
+        fixed("National Foundation Day", 2, 11, first_year=1967),
+        fixed("Emperor's Birthday", 2, 23, first_year=2020),
+        equinox("Vernal Equinox Day", 3, first_year=1955),
+        fixed("Emperor's Birthday", 4, 29, first_year=1955, last_year=1988),
+        fixed("Greenery Day", 4, 29, first_year=1989, last_year=2006),
+        fixed("Showa Day", 4, 29, first_year=2007),
+        fixed("Constitution Memorial Day", 5, 3, first_year=1955),
+        fixed("Greenery Day", 5, 4, first_year=2007),
+        fixed("Children's Day", 5, 5, first_year=1955),
+        fixed("Marine Day", 7, 20, first_year=1996, last_year=2002),
+        nth_weekday("Marine Day", 7, calendar.MONDAY, 3, first_year=2003,
+                    overrides=((2020, 7, 23), (2021, 7, 22))),
+        fixed("Mountain Day", 8, 11, first_year=2016,
+              overrides=((2020, 8, 10), (2021, 8, 8))),
+        fixed("Respect for the Aged Day", 9, 15, first_year=1967, last_year=2002),
+        nth_weekday("Respect for the Aged Day", 9, calendar.MONDAY, 3, first_year=2003),
+        equinox("Autumnal Equinox Day", 9, first_year=1955),
+        fixed("Sports Day", 10, 10, first_year=1966, last_year=1999),
+        nth_weekday("Sports Day", 10, calendar.MONDAY, 2, first_year=2000,
+                    overrides=((2020, 7, 24), (2021, 7, 23))),
+        fixed("Culture Day", 11, 3, first_year=1955),
+        fixed("Labor Thanksgiving Day", 11, 23, first_year=1955),
+        fixed("Emperor's Birthday", 12, 23, first_year=1989, last_year=2018),
+    ),
+    # Citizens' Holiday
+    bridge_from=1986,
+    substitute_from=datetime.MINYEAR,
+)
+
+# Lower-cased country name -> CountryRules.
+COUNTRY_RULES = {
+    'japan': JAPAN_RULES,
+}
 
 
-def _get_vernal_equinox_day(year):
+def get_holidays(country, year):
     """
-    Returns Vernal Equinox Day (Shunbun no Hi).
-    Calculated using astronomical approximation.
+    Returns a set of (month, day) tuples for the holidays of the specified country and year.
+
+    The country is looked up in COUNTRY_RULES; other countries have no holidays.
+    Results are memoized per (country, year) in a bounded LRU cache, so the
+    returned set is immutable and shared between callers.
+
+    Args:
+        country (str): The name of the country (e.g., 'Japan').
+        year (int): The year to calculate holidays for.
+
+    Returns:
+        frozenset: A set of tuples (month, day) representing the holidays.
     """
-    if year < 1955:
-        return None
+    COUNTERS['holiday_lookups'] += 1
+    return _get_cached_holidays(country.lower(), year)
 
-    if 1955 <= year <= 1979:
-        constant = 20.8357
-    elif 1980 <= year <= 2099:
-        constant = 20.8431
-    else:
-        # Fallback or future expansion; currently not strictly defined by this formula
-        return None
 
-    day = int(constant + 0.242194 * (year - 1980)) - int((year - 1980) // 4)
-    return (3, day)
+def holiday_cache_info():
+    """
+    Returns the hit/miss statistics of the holiday caches.
 
+    The per-year cache and the cache of computed blocks of years are
+    reported together, each field being the sum over both caches.
 
-def _get_autumnal_equinox_day(year):
+    Returns:
+        functools._CacheInfo: Named tuple with hits, misses, maxsize and currsize.
     """
-    Returns Autumnal Equinox Day (Shūbun no Hi).
-    Calculated using astronomical approximation.
+    # pylint sees the wrapped functions' parameters on the lru_cache wrappers
+    years = _get_cached_holidays.cache_info()  # pylint: disable=no-value-for-parameter
+    blocks = _get_holiday_block.cache_info()  # pylint: disable=no-value-for-parameter
+    return type(years)(*(total + extra for total, extra in zip(years, blocks)))
+
+
+def clear_holiday_cache():
+    """Empties the holiday caches and resets their statistics."""
+    _get_cached_holidays.cache_clear()
+    _get_holiday_block.cache_clear()
+
+
+def get_holidays_range(country, start_year, end_year):
     """
-    if year < 1955:
-        return None
+    Returns the holidays of a country for a whole span of years.
 
-    if 1955 <= year <= 1979:
-        constant = 23.2588
-    elif 1980 <= year <= 2099:
-        constant = 23.2488
-    else:
+    The rules are evaluated once over the vector of years (with NumPy when it
+    is installed), and the Citizens' Holiday and substitute holiday rules are
+    applied in a single sweep over the sorted result.
+
+    Args:
+        country (str): The name of the country (e.g., 'Japan').
+        start_year (int): The first year of the span.
+        end_year (int): The last year of the span (inclusive).
+
+    Returns:
+        numpy.ndarray or array.array: Sorted proleptic Gregorian ordinals
+        (see datetime.date.toordinal) of every holiday in the span.
+    """
+    ordinals = []
+    country_rules = COUNTRY_RULES.get(country.lower())
+    if country_rules is not None and start_year <= end_year:
+        # Evaluate one extra year on each side so that rules spilling over
+        # a year boundary see their neighbours.
+        first = max(start_year - 1, datetime.MINYEAR)
+        last = min(end_year + 1, datetime.MAXYEAR)
+        ordinals = _apply_ordinal_rules(country_rules,
+                                        _get_base_ordinals(country_rules, first, last))
+        low = _ordinal(start_year, 1, 1)
+        high = _ordinal(end_year, 12, 31)
+        ordinals = [ordinal for ordinal in ordinals if low <= ordinal <= high]
+
+    numpy = import_numpy()
+    if numpy is not None:
+        return numpy.array(ordinals, dtype=numpy.int32)
+    return array('i', ordinals)
+
+
+@functools.lru_cache(maxsize=None)
+def import_numpy():
+    """
+    Returns the numpy module, or None if it is not installed.
+
+    NumPy is optional and slow to import, so it is only loaded by the
+    multi-year APIs that benefit from it.
+    """
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
         return None
+    return numpy
 
-    day = int(constant + 0.242194 * (year - 1980)) - int((year - 1980) // 4)
-    return (9, day)
 
+class HolidaySpan:
+    """
+    The holidays of a country over a span of years, precomputed by a
+    subclass (HolidayIndex, hcal_business.BusinessCalendar) for fast date
+    queries. Dates outside the span raise ValueError.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, country, start_year, end_year):
+        """
+        Initializes the HolidaySpan.
+
+        Args:
+            country (str): The name of the country (e.g., 'Japan').
+            start_year (int): The first year covered.
+            end_year (int): The last year covered (inclusive).
+        """
+        self.country = country
+        self.start_year = start_year
+        self.end_year = end_year
+        self._first = datetime.date(start_year, 1, 1).toordinal()
+        self._last = datetime.date(end_year, 12, 31).toordinal()
+
+    def _to_ordinal(self, date):
+        """Returns the ordinal of a date, checking that it is covered by the span."""
+        ordinal = date.toordinal()
+        if not self._first <= ordinal <= self._last:
+            raise ValueError(f"{date} is outside the years {self.start_year}-{self.end_year}")
+        return ordinal
+
+
+class HolidayIndex(HolidaySpan):
+    """
+    A sorted ordinal index of holidays answering date queries in O(log n).
 
-def _get_sports_day(year):
-    """Returns Sports Day."""
-    if 1966 <= year <= 1999:
-        return (10, 10)
-    if year >= 2000:
-        if year == 2020:
-            return (7, 24)
-        if year == 2021:
-            return (7, 23)
-        return (10, get_specific_monday(year, 10, 2))
-    return None
+    The index is built once from get_holidays_range for a span of years;
+    queries outside that span raise ValueError.
+    """
 
+    def __init__(self, country, start_year, end_year):
+        """
+        Initializes the HolidayIndex.
+
+        Args:
+            country (str): The name of the country (e.g., 'Japan').
+            start_year (int): The first year covered by the index.
+            end_year (int): The last year covered by the index (inclusive).
+        """
+        super().__init__(country, start_year, end_year)
+        self._ordinals = array('i', get_holidays_range(country, start_year, end_year))
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def _bounds(self, start, end):
+        """Returns the index slice of holidays between start and end inclusive."""
+        low = bisect.bisect_left(self._ordinals, self._to_ordinal(start))
+        high = bisect.bisect_right(self._ordinals, self._to_ordinal(end))
+        return low, max(low, high)
+
+    def is_holiday(self, date):
+        """
+        Returns True if the date is a holiday.
+
+        Args:
+            date (datetime.date): The date to check.
+        """
+        ordinal = self._to_ordinal(date)
+        pos = bisect.bisect_left(self._ordinals, ordinal)
+        return pos < len(self._ordinals) and self._ordinals[pos] == ordinal
+
+    def holidays_between(self, start, end):
+        """
+        Returns the holidays between two dates.
+
+        Args:
+            start (datetime.date): The first date (inclusive).
+            end (datetime.date): The last date (inclusive).
+
+        Returns:
+            list: The holidays as datetime.date objects, in order.
+        """
+        low, high = self._bounds(start, end)
+        return [datetime.date.fromordinal(ordinal) for ordinal in self._ordinals[low:high]]
+
+    def count_between(self, start, end):
+        """
+        Returns the number of holidays between two dates.
+
+        Args:
+            start (datetime.date): The first date (inclusive).
+            end (datetime.date): The last date (inclusive).
+
+        Returns:
+            int: The number of holidays.
+        """
+        low, high = self._bounds(start, end)
+        return high - low
+
+
+# Kinds of Holiday records: FIXED and VARIABLE holidays come from the rules
+# (VARIABLE from NTH_WEEKDAY and EQUINOX ones), the others from the policies.
+VARIABLE = 'variable'
+SUBSTITUTE = 'substitute'
+CITIZENS = 'citizens'
+HOLIDAY_KINDS = (FIXED, VARIABLE, SUBSTITUTE, CITIZENS)
+
+# Names of the holidays added by the substitute and bridge policies.
+SUBSTITUTE_HOLIDAY = "Substitute Holiday"
+CITIZENS_HOLIDAY = "Citizens' Holiday"
+
+
+class Holiday:
+    """
+    A named holiday.
 
-def _get_mountain_day(year):
-    """Returns Mountain Day."""
-    if year < 2016:
-        return None
-    if year == 2020:
-        return (8, 10)
-    if year == 2021:
-        return (8, 8)
-    return (8, 11)
-
-
-def _get_respect_for_the_aged_day(year):
-    """Returns Respect for the Aged Day."""
-    if 1967 <= year <= 2002:
-        return (9, 15)
-    if year >= 2003:
-        return (9, get_specific_monday(year, 9, 3))
-    return None
+    Attributes:
+        ordinal (int): The proleptic Gregorian ordinal of the date.
+        name (str): The name of the holiday.
+        kind (str): One of HOLIDAY_KINDS.
+    """
+    __slots__ = ('ordinal', 'name', 'kind')
 
+    def __init__(self, ordinal, name, kind):
+        self.ordinal = ordinal
+        self.name = name
+        self.kind = kind
 
-def _get_japan_variable_holidays(year):
-    """Returns a set of variable date holidays for Japan."""
-    holidays = set()
+    @property
+    def date(self):
+        """datetime.date: The date of the holiday."""
+        return datetime.date.fromordinal(self.ordinal)
 
-    # Coming of Age Day
-    holidays.add(_get_coming_of_age_day(year))
+    def _key(self):
+        return self.ordinal, self.name, self.kind
 
-    # Emperor's Birthday
-    emp_bday = _get_emperor_birthday(year)
-    if emp_bday:
-        holidays.add(emp_bday)
+    def __eq__(self, other):
+        if not isinstance(other, Holiday):
+            return NotImplemented
+        return self._key() == other._key()  # pylint: disable=protected-access
 
-    # Marine Day (Sea Day)
-    marine_day = _get_marine_day(year)
-    if marine_day:
-        holidays.add(marine_day)
+    def __hash__(self):
+        return hash(self._key())
 
-    # Mountain Day
-    mountain_day = _get_mountain_day(year)
-    if mountain_day:
-        holidays.add(mountain_day)
+    def __repr__(self):
+        return f"Holiday({self.date.isoformat()}, {self.name!r}, {self.kind!r})"
 
-    # Respect for the Aged Day
-    respect_day = _get_respect_for_the_aged_day(year)
-    if respect_day:
-        holidays.add(respect_day)
 
-    # Greenery Day
-    greenery_day = _get_greenery_day(year)
-    if greenery_day:
-        holidays.add(greenery_day)
+class HolidayRecords:
+    """
+    The named holidays of a span of years, stored compactly.
 
-    # Vernal Equinox Day
-    vernal_equinox = _get_vernal_equinox_day(year)
-    if vernal_equinox:
-        holidays.add(vernal_equinox)
+    Each holiday takes five bytes: its ordinal in an int32 array and a code
+    byte holding the index of its name in a table of interned names and its
+    kind. Holiday objects are only created while iterating.
+    """
+    __slots__ = ('country', 'start_year', 'end_year', 'names', '_ordinals', '_codes')
+
+    def __init__(self, country, start_year, end_year, names, ordinals, codes):
+        """
+        Initializes the HolidayRecords.
+
+        Args:
+            country (str): The name of the country (e.g., 'Japan').
+            start_year (int): The first year covered.
+            end_year (int): The last year covered (inclusive).
+            names (tuple): The interned holiday names.
+            ordinals (array.array): The sorted holiday ordinals.
+            codes (array.array): name index * 4 + index in HOLIDAY_KINDS,
+                for each ordinal.
+        """
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self.country = country
+        self.start_year = start_year
+        self.end_year = end_year
+        self.names = names
+        self._ordinals = ordinals
+        self._codes = codes
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __iter__(self):
+        return self._records(0, len(self._ordinals))
+
+    def _records(self, low, high):
+        """Yields the Holiday records from index low to high (exclusive)."""
+        names = self.names
+        codes = self._codes
+        for index in range(low, high):
+            code = codes[index]
+            yield Holiday(self._ordinals[index], names[code >> 2], HOLIDAY_KINDS[code & 3])
+
+    def between(self, start, end):
+        """
+        Returns the holidays between two dates.
+
+        Args:
+            start (datetime.date): The first date (inclusive).
+            end (datetime.date): The last date (inclusive).
+
+        Returns:
+            list: The Holiday records, in date order.
+        """
+        low = bisect.bisect_left(self._ordinals, start.toordinal())
+        high = bisect.bisect_right(self._ordinals, end.toordinal())
+        return list(self._records(low, max(low, high)))
+
+    @property
+    def nbytes(self):
+        """int: The size of the ordinal and code arrays in bytes."""
+        return (len(self._ordinals) * self._ordinals.itemsize +
+                len(self._codes) * self._codes.itemsize)
+
+
+def get_holiday_records(country, start_year, end_year):
+    """
+    Returns the named holidays of a country for a span of years.
 
-    # Autumnal Equinox Day
-    autumnal_equinox = _get_autumnal_equinox_day(year)
-    if autumnal_equinox:
-        holidays.add(autumnal_equinox)
+    The rules are evaluated one by one to keep each holiday's name, and the
+    bridge and substitute policies are applied exactly as for get_holidays,
+    so the dates always agree with it.
 
-    # Sports Day
-    sports_day = _get_sports_day(year)
-    if sports_day:
-        holidays.add(sports_day)
+    Args:
+        country (str): The name of the country (e.g., 'Japan').
+        start_year (int): The first year of the span.
+        end_year (int): The last year of the span (inclusive).
 
-    return holidays
+    Returns:
+        HolidayRecords: The holidays of the span.
+    """
+    named = {}
+    country_rules = COUNTRY_RULES.get(country.lower())
+    if country_rules is not None and start_year <= end_year:
+        named = _named_ordinals(country_rules, start_year, end_year)
+
+    low = _ordinal(start_year, 1, 1)
+    high = _ordinal(end_year, 12, 31)
+    names = {}
+    ordinals = []
+    codes = []
+    for ordinal in sorted(named):
+        if low <= ordinal <= high:
+            name, kind = named[ordinal]
+            index = names.setdefault(sys.intern(name), len(names))
+            ordinals.append(ordinal)
+            codes.append(index << 2 | HOLIDAY_KINDS.index(kind))
+    return HolidayRecords(country, start_year, end_year, tuple(names),
+                          array('i', ordinals), array('B' if len(names) <= 64 else 'H', codes))
+
+
+def _named_ordinals(country_rules, start_year, end_year):
+    """
+    Evaluates a country's rules and policies, keeping each holiday's name.
+
+    Returns:
+        dict: Ordinal to (name, kind) for the span plus one year on each
+        side, as in get_holidays_range.
+    """
+    named = {}
+    first = max(start_year - 1, datetime.MINYEAR)
+    last = min(end_year + 1, datetime.MAXYEAR)
+    for rule in country_rules.rules:
+        kind = FIXED if rule.kind == FIXED else VARIABLE
+        low = max(first, rule.first_year or first)
+        high = min(last, rule.last_year or last)
+        for year in range(low, high + 1):
+            ordinal = _rule_ordinals(rule, year)
+            if ordinal:
+                named.setdefault(ordinal, (rule.name, kind))
 
+    # The days added by each policy are named after it
+    days = _apply_bridge_policy(country_rules, sorted(named))
+    for ordinal in days:
+        named.setdefault(ordinal, (CITIZENS_HOLIDAY, CITIZENS))
+    for ordinal in _substitute_ordinals(country_rules, days):
+        named[ordinal] = (SUBSTITUTE_HOLIDAY, SUBSTITUTE)
+    return named
 
-def _apply_citizens_holiday(holiday_dates, year):
-    """Applies the Citizens' Holiday (sandwich rule)."""
-    if year < 1986:
-        return
 
-    sorted_dates = sorted(list(holiday_dates))
-    sandwiches = []
-    for i in range(len(sorted_dates) - 1):
-        date_1 = sorted_dates[i]
-        date_2 = sorted_dates[i + 1]
-        if (date_2 - date_1).days == 2:
-            sandwich_date = date_1 + datetime.timedelta(days=1)
-            # If it's not Sunday and not already a holiday
-            if sandwich_date.weekday() != 6:
-                sandwiches.append(sandwich_date)
-    for s_date in sandwiches:
-        holiday_dates.add(s_date)
+def _is_vector(values):
+    """Returns True if values is a NumPy array rather than a scalar."""
+    return not isinstance(values, (int, float))
 
 
-def _apply_substitute_holiday(holiday_dates):
-    """Applies the substitute holiday rule (Monday following Sunday)."""
-    sorted_original_dates = sorted(list(holiday_dates))
+def _where(condition, if_true, if_false):
+    """Element-wise conditional that works for NumPy arrays and scalars."""
+    if _is_vector(condition):
+        return import_numpy().where(condition, if_true, if_false)
+    return if_true if condition else if_false
 
-    for h_date in sorted_original_dates:
-        if h_date.weekday() == 6:  # Sunday
-            candidate = h_date + datetime.timedelta(days=1)
-            while candidate in holiday_dates:
-                candidate += datetime.timedelta(days=1)
-            holiday_dates.add(candidate)
 
+def _ordinal(years, month, day):
+    """Returns the ordinal of month/day in each of the years."""
+    prior = years - 1
+    is_leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    return (prior * 365 + prior // 4 - prior // 100 + prior // 400 +
+            DAYS_BEFORE_MONTH[month] + (month > 2) * is_leap + day)
 
-def get_holidays(country, year):
+
+def _weekday(ordinals):
+    """Returns the weekday (0=Monday, 6=Sunday) of ordinals."""
+    return (ordinals + 6) % 7
+
+
+def _nth_weekday(years, month, weekday, nth):
+    """Returns the ordinal of the nth given weekday of a month in each of the years."""
+    first_day = _ordinal(years, month, 1)
+    return first_day + (weekday - _weekday(first_day)) % 7 + (nth - 1) * 7
+
+
+def _equinox_ordinals(years, month):
+    """Returns the ordinal of the equinox of month in each of the years (0 if unknown)."""
+    if not _is_vector(years):
+        day = equinox_day(month, years)
+        return _ordinal(years, month, day) if day else 0
+
+    numpy = import_numpy()
+    table = numpy.frombuffer(EQUINOX_DAYS[month], dtype=numpy.uint8).astype(numpy.int64)
+    index = numpy.clip(years - EQUINOX_TABLE_START, 0, len(table) - 1)
+    in_table = (years >= EQUINOX_TABLE_START) & (years <= EQUINOX_TABLE_END)
+    days = numpy.where(in_table, table[index], 0)
+    return numpy.where(days > 0, _ordinal(years, month, 1) + days - 1, 0)
+
+
+def _rule_ordinals(rule, years):
     """
-    Returns a set of (month, day) tuples for the holidays of the specified country and year.
+    Returns the ordinal of a rule's holiday in each of the years (0 if absent).
+
+    Works on a NumPy vector of years as well as on a single year.
+    """
+    if rule.kind == FIXED:
+        ordinals = _ordinal(years, rule.month, rule.value)
+    elif rule.kind == NTH_WEEKDAY:
+        ordinals = _nth_weekday(years, rule.month, *rule.value)
+    else:
+        ordinals = _equinox_ordinals(years, rule.month)
+
+    for year, month, day in rule.overrides:
+        ordinals = _where(years == year, _ordinal(years, month, day), ordinals)
+
+    if rule.first_year is not None and rule.last_year is not None:
+        return _where((years >= rule.first_year) & (years <= rule.last_year), ordinals, 0)
+    if rule.first_year is not None:
+        return _where(years >= rule.first_year, ordinals, 0)
+    if rule.last_year is not None:
+        return _where(years <= rule.last_year, ordinals, 0)
+    return ordinals
+
+
+def _get_base_ordinals(country_rules, start_year, end_year):
+    """Returns the sorted, unique holiday ordinals of a span before the policies."""
+    numpy = import_numpy()
+    if numpy is not None:
+        years = numpy.arange(start_year, end_year + 1, dtype=numpy.int64)
+        ordinals = numpy.concatenate([_rule_ordinals(rule, years)
+                                      for rule in country_rules.rules])
+        return numpy.unique(ordinals[ordinals > 0]).tolist()
+    return _evaluate_base_ordinals(country_rules, start_year, end_year)
+
+
+def _evaluate_base_ordinals(country_rules, start_year, end_year):
+    """
+    Returns the sorted base holiday ordinals of a span, from the compiled
+    rules. Duplicates are possible; _apply_ordinal_rules drops them.
+    """
+    evaluator = _get_evaluator(country_rules)
+    ordinals = []
+    for year in range(start_year, end_year + 1):
+        ordinals.extend(evaluator.base_ordinals(year))
+    return ordinals
+
+
+def _apply_ordinal_rules(country_rules, base_ordinals):
+    """
+    Applies the bridge and substitute holiday policies to a sorted list of
+    holiday ordinals spanning any number of years.
+
+    Each policy is one linear pass over the whole span, so holidays that
+    cross a year boundary are handled like any others.
+    """
+    days = _apply_bridge_policy(country_rules, base_ordinals)
+    # Two sorted runs: sorting merges them in linear time
+    result = days + _substitute_ordinals(country_rules, days)
+    result.sort()
+    return result
+
 
-    Currently, supports 'Japan' with fixed holidays and substitute holiday logic.
+def _apply_bridge_policy(country_rules, base_ordinals):
+    """
+    Returns the sorted, unique holiday ordinals with the bridge (Citizens'
+    Holiday) days added. Ordinals that are multiples of 7 are Sundays.
+    """
+    if country_rules.bridge_from is None:
+        return sorted(set(base_ordinals))
+
+    bridge_start = _ordinal(country_rules.bridge_from, 1, 1)
+    days = []
+    previous = None
+    for ordinal in base_ordinals:
+        if ordinal == previous:
+            continue
+        # A non-Sunday sandwiched between two holidays becomes a holiday
+        if (previous is not None and ordinal - previous == 2 and
+                previous >= bridge_start and (previous + 1) % 7 != 0):
+            days.append(previous + 1)
+        days.append(ordinal)
+        previous = ordinal
+    return days
+
+
+def _substitute_ordinals(country_rules, days):
+    """
+    Returns the sorted ordinals of the substitute holidays for the sorted
+    holiday ordinals days: a Sunday holiday moves to the next day that is
+    not a holiday.
+    """
+    if country_rules.substitute_from is None:
+        return []
+
+    substitute_start = _ordinal(country_rules.substitute_from, 1, 1)
+    holidays = set(days)
+    substitutes = []
+    for ordinal in days:
+        if ordinal % 7 == 0 and ordinal >= substitute_start:
+            candidate = ordinal + 1
+            while candidate in holidays:
+                candidate += 1
+            holidays.add(candidate)
+            substitutes.append(candidate)
+    return substitutes
+
+
+def _month_day_table(leap):
+    """Returns a tuple mapping day of the year (1-based) to a (month, day) pair."""
+    table = [None]
+    for month in range(1, 13):
+        days = calendar.monthrange(2000 if leap else 2001, month)[1]
+        table.extend((month, day) for day in range(1, days + 1))
+    return tuple(table)
+
+
+# Day of the year -> (month, day), shared by every computed holiday set.
+_MONTH_DAY = (_month_day_table(False), _month_day_table(True))
+
+
+class _RuleEvaluator:
+    """
+    A CountryRules table compiled for fast per-year evaluation.
+
+    The years are split into eras in which the same rules apply (bounded by
+    every first/last year and override year of the table). Within an era,
+    the fixed-date and nth-weekday holidays only depend on the leap year
+    flag and the weekday of Jan 1, so each era memoizes them for those 14
+    patterns and only the equinox days are looked up per year. The bridge
+    and substitute policies are applied afterwards, across years, by
+    _apply_ordinal_rules.
+    """
+    # pylint: disable=too-few-public-methods
+    __slots__ = ('_breaks', '_eras')
+
+    def __init__(self, country_rules):
+        """
+        Compiles the rules.
+
+        Args:
+            country_rules (CountryRules): The table to compile.
+        """
+
+        breaks = set()
+        for rule in country_rules.rules:
+            if rule.first_year is not None:
+                breaks.add(rule.first_year)
+            if rule.last_year is not None:
+                breaks.add(rule.last_year + 1)
+            for year, _, _ in rule.overrides:
+                breaks.update((year, year + 1))
+        self._breaks = sorted(breaks)
+
+        # Era i covers the years before _breaks[i] (and from _breaks[i - 1]).
+        starts = [self._breaks[0] - 1 if self._breaks else 1] + self._breaks
+        self._eras = [self._compile_era(country_rules.rules, year) for year in starts]
+
+    @staticmethod
+    def _compile_era(rules, year):
+        """
+        Returns the era containing year as [patterns, fixed dates, nth
+        weekday rules, equinox months], where patterns caches the days of
+        the year of the fixed and nth-weekday holidays by (leap, weekday).
+        """
+        fixed_dates = []
+        nth_rules = []
+        equinox_months = []
+        for rule in rules:
+            if ((rule.first_year is not None and year < rule.first_year) or
+                    (rule.last_year is not None and year > rule.last_year)):
+                continue
+            override = [(month, day) for override_year, month, day in rule.overrides
+                        if override_year == year]
+            if override:
+                fixed_dates.append(override[0])
+            elif rule.kind == FIXED:
+                fixed_dates.append((rule.month, rule.value))
+            elif rule.kind == NTH_WEEKDAY:
+                weekday, nth = rule.value
+                nth_rules.append((rule.month, weekday, (nth - 1) * 7))
+            else:
+                equinox_months.append(rule.month)
+        return [{}, tuple(fixed_dates), tuple(nth_rules), tuple(equinox_months)]
+
+    @staticmethod
+    def _pattern_days(era, leap, weekday):
+        """
+        Returns the sorted days of the year of an era's fixed and nth-weekday
+        holidays, for a year whose day 0 (Dec 31 before it) is on weekday.
+        """
+        _, fixed_dates, nth_rules, _ = era
+        days = {DAYS_BEFORE_MONTH[month] + (leap and month > 2) + day
+                for month, day in fixed_dates}
+        for month, nth_weekday_, weeks in nth_rules:
+            month_start = DAYS_BEFORE_MONTH[month] + (leap and month > 2)
+            # Day month_start + 1 is the first of the month
+            days.add(month_start + 1 + (nth_weekday_ - (weekday + month_start) % 7) % 7 + weeks)
+        return tuple(sorted(days))
+
+    def base_ordinals(self, year):
+        """
+        Returns the ordinals of the holidays of a year before the bridge and
+        substitute policies, sorted (with any duplicates kept).
+        """
+        era = self._eras[bisect.bisect_right(self._breaks, year)]
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        prior = year - 1
+        # Ordinal of Dec 31 of the previous year, i.e. day 0 of this year
+        before = prior * 365 + prior // 4 - prior // 100 + prior // 400
+
+        # Within an era, the fixed and nth-weekday holidays only depend on
+        # whether the year is a leap year and on its starting weekday.
+        key = (leap, before % 7)
+        days = era[0].get(key)
+        if days is None:
+            days = era[0][key] = self._pattern_days(era, leap, before % 7)
+        ordinals = [before + day for day in days]
+
+        equinox_months = era[3]
+        if equinox_months:
+            for month in equinox_months:
+                day = equinox_day(month, year)
+                if day:
+                    ordinals.append(before + DAYS_BEFORE_MONTH[month] + (leap and month > 2) + day)
+            ordinals.sort()
+        return ordinals
+
+
+# id(CountryRules) -> (CountryRules, _RuleEvaluator); holding the table keeps its id unique.
+_evaluators = {}
+
+
+def _get_evaluator(country_rules):
+    """Returns the compiled evaluator of a CountryRules table, compiling it once."""
+    entry = _evaluators.get(id(country_rules))
+    if entry is None or entry[0] is not country_rules:
+        entry = (country_rules, _RuleEvaluator(country_rules))
+        _evaluators[id(country_rules)] = entry
+    return entry[1]
+
+
+@functools.lru_cache(maxsize=HOLIDAY_CACHE_SIZE // HOLIDAY_BLOCK_YEARS)
+def _get_holiday_block(country, block):
+    """
+    Returns the holidays of a block of HOLIDAY_BLOCK_YEARS years.
+
+    The block is computed in one sweep together with one year on each side,
+    so bridge and substitute holidays spilling over Dec 31 land in the
+    right year.
 
     Args:
-        country (str): The name of the country (e.g., 'Japan').
-        year (int): The year to calculate holidays for.
+        country (str): A lower-cased country name from COUNTRY_RULES.
+        block (int): The block number (year // HOLIDAY_BLOCK_YEARS).
 
     Returns:
-        set: A set of tuples (month, day) representing the holidays.
+        tuple: The first year of the block and a tuple with the
+        frozenset of (month, day) holidays of each of its years.
     """
-    holidays = set()
+    country_rules = COUNTRY_RULES[country]
+    first = max(block * HOLIDAY_BLOCK_YEARS, datetime.MINYEAR)
+    last = min(block * HOLIDAY_BLOCK_YEARS + HOLIDAY_BLOCK_YEARS - 1, datetime.MAXYEAR)
+    ordinals = _apply_ordinal_rules(country_rules, _evaluate_base_ordinals(
+        country_rules, max(first - 1, datetime.MINYEAR), min(last + 1, datetime.MAXYEAR)))
+
+    years = []
+    index = bisect.bisect_left(ordinals, _ordinal(first, 1, 1))
+    for year in range(first, last + 1):
+        leap = calendar.isleap(year)
+        before_jan_1 = _ordinal(year, 1, 1) - 1
+        end = bisect.bisect_left(ordinals, before_jan_1 + 366 + leap, index)
+        month_day = _MONTH_DAY[leap]
+        years.append(frozenset(month_day[ordinal - before_jan_1]
+                               for ordinal in ordinals[index:end]))
+        index = end
+    return first, tuple(years)
+
+
+def set_holiday_store(lookup):
+    """
+    Installs a persistent store consulted before computing a year's holidays.
 
-    if country.lower() == 'japan':
-        holidays.update(_get_japan_fixed_holidays(year))
-        holidays.update(_get_japan_variable_holidays(year))
+    hcal_holiday_store registers its lookup here when it is imported; this
+    module does not depend on it.
+
+    Args:
+        lookup (callable): Takes a lower-cased country name and a year and
+            returns the stored frozenset of (month, day) holidays, or None
+            if the year is not stored. None removes the store.
+    """
+    _holiday_store['lookup'] = lookup
+
+
+# The lookup installed by set_holiday_store, if any.
+_holiday_store = {'lookup': None}
 
-        # Convert to date objects for advanced logic
-        holiday_dates = set()
-        for month, day in holidays:
-            try:
-                holiday_dates.add(datetime.date(year, month, day))
-            except ValueError:
-                continue
 
-        _apply_citizens_holiday(holiday_dates, year)
-        _apply_substitute_holiday(holiday_dates)
+@functools.lru_cache(maxsize=HOLIDAY_CACHE_SIZE)
+def _get_cached_holidays(country, year):
+    """Computes the holidays for a lower-cased country name and a year."""
+    lookup = _holiday_store['lookup']
+    stored = lookup(country, year) if lookup is not None else None
+    if stored is not None:
+        COUNTERS['holiday_store_hits'] += 1
+        return stored
+    COUNTERS['holiday_computations'] += 1
+    return _compute_holidays(country, year)
 
-        # Convert back to (month, day) tuples
-        holidays = set((d.month, d.day) for d in holiday_dates)
 
-    return holidays
+def _compute_holidays(country, year):
+    """Computes the set of (month, day) holidays without consulting the cache."""
+    if country not in COUNTRY_RULES or not datetime.MINYEAR <= year <= datetime.MAXYEAR:
+        return frozenset()
+    first, years = _get_holiday_block(country, year // HOLIDAY_BLOCK_YEARS)
+    return years[year - first]
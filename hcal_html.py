@@ -0,0 +1,158 @@
+"""
+HTML rendering of hcal calendars for `hcal --format html`.
+
+The markup of a month only depends on its layout: the first day of the
+week, the weekday of the 1st, the number of days and, with Julian days, the
+day of the year it starts at. Each layout is compiled once into a
+str.format template with the weekend classes already in place, and a month
+is produced by filling its title and the holiday and today classes of its
+days. Styling comes from a single shared STYLESHEET.
+"""
+import calendar
+import functools
+import html
+from itertools import groupby
+
+from hcal_util import ANSI_COLORS, DAYS_BEFORE_MONTH, DAYS_IN_WEEK, HighlightCalendar
+
+STYLESHEET = """\
+.hcal { font-family: sans-serif; }
+.hcal .months { display: flex; flex-wrap: wrap; gap: 1.5em; }
+.hcal table.month { border-collapse: collapse; text-align: right; }
+.hcal caption { font-weight: bold; padding-bottom: 0.25em; }
+.hcal th, .hcal td { padding: 0.1em 0.35em; }
+.hcal .sat { color: blue; }
+.hcal .sun { color: red; }
+.hcal .holiday { color: var(--hcal-holiday, red); }
+.hcal .today { background: black; color: white; }
+"""
+
+
+def _escape_braces(text):
+    """Escapes literal text for use in a str.format template."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _weekend_class(weekday):
+    """Returns the class of a weekday column: 'sat', 'sun' or ''."""
+    if weekday == calendar.SATURDAY:
+        return 'sat'
+    if weekday == calendar.SUNDAY:
+        return 'sun'
+    return ''
+
+
+@functools.lru_cache(maxsize=None)
+def month_template(firstweekday, start_weekday, days, julian_start, header):
+    """
+    Returns the compiled template of a month layout.
+
+    Args:
+        firstweekday (int): The first day of the week (0=Monday, 6=Sunday).
+        start_weekday (int): The weekday of the 1st.
+        days (int): The number of days in the month.
+        julian_start (int): The day of the year before the 1st, or None to
+            label days by day of the month.
+        header (tuple): The seven weekday labels, from firstweekday on.
+
+    Returns:
+        str: A str.format template taking the escaped title as {title} and,
+        for each day, the extra classes of its cell (e.g. ' holiday') as a
+        positional argument.
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    parts = ['<table class="month"><caption>{title}</caption><thead><tr>']
+    for column, label in enumerate(header):
+        weekend = _weekend_class((firstweekday + column) % DAYS_IN_WEEK)
+        cell = f'<th class="{weekend}">' if weekend else '<th>'
+        parts.append(cell + _escape_braces(html.escape(label)) + '</th>')
+    parts.append('</tr></thead><tbody><tr>')
+
+    column = (start_weekday - firstweekday) % DAYS_IN_WEEK
+    parts.append('<td></td>' * column)
+    for day in range(1, days + 1):
+        if column == DAYS_IN_WEEK:
+            parts.append('</tr><tr>')
+            column = 0
+        weekend = _weekend_class((start_weekday + day - 1) % DAYS_IN_WEEK)
+        label = day if julian_start is None else julian_start + day
+        parts.append(f'<td class="day{" " + weekend if weekend else ""}{{{day - 1}}}">'
+                     f'{label}</td>')
+        column += 1
+    parts.append('<td></td>' * (DAYS_IN_WEEK - column))
+    parts.append('</tr></tbody></table>')
+    return ''.join(parts)
+
+
+class HtmlCalendar(HighlightCalendar):
+    """
+    A HighlightCalendar rendering months as HTML tables.
+
+    Days are classified as in the text calendar: weekends, holidays and
+    today become the CSS classes 'sat'/'sun', 'holiday' and 'today'.
+    """
+
+    @functools.cached_property
+    def header_labels(self):
+        """tuple: The seven weekday labels, from firstweekday on."""
+        return tuple(self.formatweekday(weekday, self.formatmonth_w).strip()
+                     for weekday in self.iterweekdays())
+
+    def formatmonth_html(self, theyear, themonth):
+        """
+        Returns a month as an HTML table.
+
+        Args:
+            theyear (int): The year.
+            themonth (int): The month.
+
+        Returns:
+            str: The table markup.
+        """
+        self.start_month(theyear, themonth)
+        start_weekday, days = calendar.monthrange(theyear, themonth)
+        julian_start = None
+        if self.julian:
+            julian_start = (DAYS_BEFORE_MONTH[themonth] +
+                            (themonth > 2 and calendar.isleap(theyear)))
+        template = month_template(self.firstweekday, start_weekday, days, julian_start,
+                                  self.header_labels)
+
+        classes = [''] * days
+        for month, day in self.holidays:
+            if month == themonth:
+                classes[day - 1] = ' holiday'
+        if (self.highlight_today and self.today and
+                self.today.year == theyear and self.today.month == themonth):
+            classes[self.today.day - 1] += ' today'
+        title = html.escape(self.formatmonthname(theyear, themonth, 0).strip())
+        return template.format(*classes, title=title)
+
+
+def write_html(cal, out, month_list, show_year_headers):
+    """
+    Writes the months as an HTML page, one block per year.
+
+    Args:
+        cal (HtmlCalendar): The calendar rendering the months.
+        out (OutputBuffer): The buffer receiving the page.
+        month_list (list): The (year, month) pairs to show, in order.
+        show_year_headers (bool): Whether to head each year with its number.
+    """
+    out.line('<!DOCTYPE html>')
+    out.line('<html><head><meta charset="utf-8"><title>hcal</title>')
+    out.write('<style>\n' + STYLESHEET)
+    # The configured names are also CSS color names
+    color = cal.holiday_color if cal.holiday_color in ANSI_COLORS else 'red'
+    out.line(f':root {{ --hcal-holiday: {color}; }}')
+    out.line('</style></head><body class="hcal">')
+    for year, group in groupby(month_list, key=lambda item: item[0]):
+        out.line('<section class="year">')
+        if show_year_headers:
+            out.line(f'<h2>{year}</h2>')
+        out.line('<div class="months">')
+        for _, month in group:
+            out.line(cal.formatmonth_html(year, month))
+        out.line('</div></section>')
+        out.end_block()
+    out.line('</body></html>')
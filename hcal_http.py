@@ -0,0 +1,430 @@
+"""
+HTTP service for hcal: `hcal --http HOST:PORT`.
+
+A threaded HTTP server answering GET (and HEAD) requests for calendar
+renders and holiday lists:
+
+    /month/YEAR/MONTH
+    /range/YEAR[/MONTH]?after=N&before=N
+    /year/YEAR
+    /holidays/YEAR[/LAST_YEAR][?country=NAME]
+
+Renders take ?format=text|json|html, ?julian=1 and ?highlight=0; holiday
+lists take ?format=json|text. Every response carries a strong ETag computed
+from the request, the configuration, the code, the holiday rules and, when
+the selection includes today, the date, so an If-None-Match revalidation is
+answered with 304 before anything is rendered, even by a restarted server.
+"""
+import collections
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import os
+import threading
+import traceback
+import types
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import hcal_cli
+import hcal_daemon
+import hcal_holidays
+from hcal_util import OutputBuffer
+
+# Rendered response bodies kept in memory, by ETag.
+RESPONSE_CACHE_SIZE = 256
+
+# Longest Cache-Control max-age, in seconds. Responses also expire at midnight.
+MAX_AGE = 3600
+
+# Idle calendar caches kept for reuse by later requests.
+MAX_IDLE_CALENDARS = 16
+
+# Limits on what a single request may ask for.
+MAX_MONTHS = 1200
+MAX_YEARS = 400
+
+CONTENT_TYPES = {
+    'text': 'text/plain; charset=utf-8',
+    'json': 'application/json',
+    'html': 'text/html; charset=utf-8',
+}
+
+
+def code_fingerprint():
+    """
+    Returns a digest of the hcal modules, so that ETags change with the code.
+
+    Restarting a server running the same code keeps its ETags, and clients
+    can keep revalidating their cached responses.
+    """
+    digest = hashlib.sha1()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.startswith('hcal') and name.endswith('.py'):
+            with open(os.path.join(directory, name), 'rb') as source:
+                digest.update(name.encode('utf-8') + b'\0' + source.read())
+    return digest.hexdigest()[:16]
+
+
+# Part of every ETag.
+_CODE_FINGERPRINT = code_fingerprint()
+
+# The query-string options of a render request, named as in hcal_cli.DEFAULT_ARGS.
+RenderQuery = collections.namedtuple('RenderQuery', 'format julian no_highlight after before')
+
+
+class HttpError(Exception):
+    """Raised for requests answered with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HttpState(hcal_daemon.DaemonState):
+    """
+    Configuration, today's date, calendars and responses shared by the
+    request threads.
+
+    The configuration and the date are refreshed under a lock. Warm
+    HighlightCalendar caches are shared by all connections through a pool:
+    a calendar holds per-month state, so each cache is lent to one request
+    at a time, and the pool is emptied whenever the configuration or the
+    date changes.
+    """
+
+    def __init__(self, config_path=hcal_cli.CONFIG_PATH):
+        """
+        Initializes the HttpState.
+
+        Args:
+            config_path (str): The configuration file to watch.
+        """
+        super().__init__(config_path)
+        self.clock = datetime.datetime.now
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.config_version = None
+        self._idle_calendars = []
+        self._responses = collections.OrderedDict()
+
+    def current(self):
+        """
+        Refreshes the state and returns a consistent view of it.
+
+        Returns:
+            tuple: (now, config, config version, generation).
+        """
+        now = self.clock()
+        with self.lock:
+            config, today = self.config, self.today
+            self.refresh(now)
+            if self.config is not config or self.today != today:
+                self.generation += 1
+                self._responses.clear()
+                self._idle_calendars.clear()
+                self.config_version = hashlib.sha1(
+                    json.dumps(sorted(self.config.items())).encode('utf-8')).hexdigest()[:16]
+            return now, self.config, self.config_version, self.generation
+
+    @contextlib.contextmanager
+    def borrow_calendars(self, generation):
+        """
+        Lends an idle cache of HighlightCalendar instances (see hcal_cli.run).
+
+        Args:
+            generation (int): The generation the request was resolved in; a
+                cache is only returned to the pool if it is still current.
+        """
+        with self.lock:
+            fresh = generation == self.generation and self._idle_calendars
+            calendars = self._idle_calendars.pop() if fresh else {}
+        try:
+            yield calendars
+        finally:
+            with self.lock:
+                if (generation == self.generation and
+                        len(self._idle_calendars) < MAX_IDLE_CALENDARS):
+                    self._idle_calendars.append(calendars)
+
+    def response(self, etag, produce):
+        """
+        Returns the body for an ETag, producing and caching it when missing.
+
+        Args:
+            etag (str): The ETag of the response.
+            produce (callable): Returns the body as bytes.
+        """
+        with self.lock:
+            body = self._responses.get(etag)
+            if body is not None:
+                self._responses.move_to_end(etag)
+                return body
+        body = produce()
+        with self.lock:
+            self._responses[etag] = body
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return body
+
+
+def make_etag(*parts):
+    """Returns a strong ETag identifying the given parts."""
+    key = json.dumps([_CODE_FINGERPRINT, hcal_holidays.RULES_VERSION] + list(parts))
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(header, etag):
+    """Returns True if an If-None-Match header value matches etag."""
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def max_age(now):
+    """Returns the Cache-Control max-age: at most MAX_AGE, and never past midnight."""
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1),
+                                         datetime.time())
+    return max(0, min(MAX_AGE, int((midnight - now).total_seconds())))
+
+
+def _query_value(query, name, default):
+    """Returns the last value of a query parameter, or default."""
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _query_int(query, name, default, low, high):
+    """Returns an integer query parameter, checking its range."""
+    value = _query_value(query, name, None)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not low <= number <= high:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid {name}: '{value}'")
+    return number
+
+
+def _query_format(query, formats):
+    """Returns the ?format= parameter, checking that it is one of formats."""
+    output_format = _query_value(query, 'format', formats[0])
+    if output_format not in formats:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid format: '{output_format}'")
+    return output_format
+
+
+def _path_ints(parts, names, optional=0):
+    """Parses the integer path segments named by names (the last optional ones may be missing)."""
+    if not len(names) - optional <= len(parts) <= len(names):
+        raise HttpError(HTTPStatus.NOT_FOUND, "not found")
+    try:
+        values = [int(part) for part in parts]
+    except ValueError as error:
+        raise HttpError(HTTPStatus.NOT_FOUND, "not found") from error
+    values += [None] * (len(names) - len(values))
+    for name, value in zip(names, values):
+        if value is None:
+            continue
+        if name == 'month' and not 1 <= value <= hcal_cli.MONTHS_IN_YEAR:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid month: {value}")
+        if name != 'month' and not datetime.MINYEAR <= value <= datetime.MAXYEAR:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid year: {value}")
+    return values
+
+
+def resolve(state, path, query):
+    """
+    Maps a request to its ETag, Cache-Control max-age, content type and body.
+
+    Args:
+        state (HttpState): The shared state.
+        path (str): The request path.
+        query (dict): The parsed query string (see urllib.parse.parse_qs).
+
+    Returns:
+        tuple: (etag, max age, content type, produce), where produce()
+        returns the body as bytes.
+
+    Raises:
+        HttpError: If the request is invalid.
+    """
+    parts = [part for part in path.split('/') if part]
+    now, config, config_version, generation = state.current()
+    if parts and parts[0] == 'holidays':
+        return _resolve_holidays(parts[1:], query, config, now)
+    if parts and parts[0] in ('month', 'range', 'year'):
+        return _resolve_render(state, parts, query, (now, config, config_version, generation))
+    raise HttpError(HTTPStatus.NOT_FOUND, "not found")
+
+
+def _render_query(query, kind):
+    """Parses the query string of a /month, /range or /year request into a RenderQuery."""
+    ranged = kind == 'range'
+    return RenderQuery(
+        format=_query_format(query, ('text', 'json', 'html')),
+        julian=_query_int(query, 'julian', 0, 0, 1) == 1,
+        no_highlight=_query_int(query, 'highlight', 1, 0, 1) == 0,
+        after=_query_int(query, 'after', 0, 0, MAX_MONTHS) if ranged else 0,
+        before=_query_int(query, 'before', 0, 0, MAX_MONTHS) if ranged else 0)
+
+
+def _render_args(parts, options):
+    """Returns the hcal_cli.run arguments of a /month, /range or /year request."""
+    values = dict(hcal_cli.DEFAULT_ARGS, **options._asdict())
+    if parts[0] == 'month':
+        values['year'], values['month'] = _path_ints(parts[1:], ('year', 'month'))
+    elif parts[0] == 'year':
+        values['year_option'], = _path_ints(parts[1:], ('year',))
+    else:
+        year, month = _path_ints(parts[1:], ('year', 'month'), optional=1)
+        if month is None:
+            values['year_option'] = year
+        else:
+            values['year'], values['month'] = year, month
+    return types.SimpleNamespace(**values)
+
+
+def _selected_months(args, now):
+    """Returns the (year, month) pairs a render shows, checking they are all supported."""
+    year, month = hcal_cli.infer_year_month(args, now)
+    months = list(hcal_cli.selected_months(args, year, month))
+    if not datetime.MINYEAR <= months[0][0] <= months[-1][0] <= datetime.MAXYEAR:
+        raise HttpError(HTTPStatus.BAD_REQUEST,
+                        f"invalid range: {months[0][0]}-{months[-1][0]}")
+    return months
+
+
+def _resolve_render(state, parts, query, current):
+    """Resolves a /month, /range or /year request (see resolve)."""
+    now, config, config_version, generation = current
+    options = _render_query(query, parts[0])
+    args = _render_args(parts, options)
+    months = _selected_months(args, now)
+    # Only a selection that shows today changes when the date does
+    etag = make_etag('render', parts, *options, config_version,
+                     now.date().isoformat() if (now.year, now.month) in months else None)
+
+    def produce():
+        buffer = io.StringIO()
+        out = OutputBuffer(buffer)
+        with state.borrow_calendars(generation) as calendars:
+            hcal_cli.run(args, config, now, out, calendars)
+        out.flush()
+        return buffer.getvalue().encode('utf-8')
+
+    return etag, max_age(now), CONTENT_TYPES[options.format], produce
+
+
+def _resolve_holidays(parts, query, config, now):
+    """Resolves a /holidays request (see resolve)."""
+    start_year, end_year = _path_ints(parts, ('year', 'last_year'), optional=1)
+    if end_year is None:
+        end_year = start_year
+    if not 0 <= end_year - start_year < MAX_YEARS:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid year range: {start_year}-{end_year}")
+    output_format = _query_format(query, ('json', 'text'))
+    country = _query_value(query, 'country', config.get('country'))
+    if not country:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "no country given or configured")
+    etag = make_etag('holidays', country.lower(), start_year, end_year, output_format)
+
+    def produce():
+        records = hcal_holidays.get_holiday_records(country, start_year, end_year)
+        if output_format == 'json':
+            return json.dumps([{'date': holiday.date.isoformat(), 'name': holiday.name,
+                                'kind': holiday.kind} for holiday in records]).encode('utf-8')
+        buffer = io.StringIO()
+        out = OutputBuffer(buffer)
+        for year in range(start_year, end_year + 1):
+            hcal_cli.write_holiday_list(out, country, year)
+        out.flush()
+        return buffer.getvalue().encode('utf-8')
+
+    return etag, max_age(now), CONTENT_TYPES[output_format], produce
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Answers GET and HEAD requests from the server's HttpState."""
+
+    server_version = 'hcal'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answers a GET request."""
+        self._respond(send_body=True)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """Answers a HEAD request."""
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        try:
+            status, headers, body = self._answer()
+        except HttpError as error:
+            status, headers, body = error.status, {}, error.message
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A bug must not drop the connection without a response
+            self.log_error("error rendering %s:\n%s", self.path, traceback.format_exc())
+            status, headers, body = HTTPStatus.INTERNAL_SERVER_ERROR, {}, "internal error"
+        if isinstance(body, str):
+            headers['Content-Type'] = CONTENT_TYPES['text']
+            body = (body + '\n').encode('utf-8')
+        self._send(status, headers, body, send_body and status != HTTPStatus.NOT_MODIFIED)
+
+    def _answer(self):
+        """Returns the (status, headers, body) answering the request."""
+        url = urllib.parse.urlsplit(self.path)
+        etag, age, content_type, produce = resolve(self.server.state, url.path,
+                                                   urllib.parse.parse_qs(url.query))
+        headers = {'ETag': etag, 'Cache-Control': f'max-age={age}'}
+        if etag_matches(self.headers.get('If-None-Match', ''), etag):
+            return HTTPStatus.NOT_MODIFIED, headers, b''
+        headers['Content-Type'] = content_type
+        return HTTPStatus.OK, headers, self.server.state.response(etag, produce)
+
+    def _send(self, status, headers, body, send_body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class HttpServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server rendering requests with a shared HttpState.
+    """
+
+    def __init__(self, address, state):
+        """
+        Initializes the HttpServer.
+
+        Args:
+            address (tuple): The (host, port) to listen on.
+            state (HttpState): The state shared by all requests.
+        """
+        self.state = state
+        super().__init__(address, _RequestHandler)
+
+
+def serve(address):
+    """
+    Runs the HTTP service until interrupted or terminated.
+
+    Args:
+        address (tuple): The (host, port) to listen on.
+    """
+    host, port = address
+    hcal_daemon.run_server(hcal_daemon.listen(lambda: HttpServer(address, HttpState()),
+                                              f"{host}:{port}"))
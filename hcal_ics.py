@@ -0,0 +1,86 @@
+"""
+iCalendar (RFC 5545) export of holidays for `hcal --export-ics`.
+
+Events are generated a few decades at a time and written as they are
+produced, so memory use does not grow with the number of exported years.
+"""
+import datetime
+
+import hcal_holidays
+
+# RFC 5545 requires CRLF line endings.
+CRLF = '\r\n'
+
+PRODID = '-//hcal//Holidays//EN'
+
+# Number of years whose holiday records are computed at a time.
+CHUNK_YEARS = 50
+
+
+def format_date(date):
+    """Returns a date in the iCalendar DATE form (YYYYMMDD, zero-padded)."""
+    return f'{date.year:04d}{date.month:02d}{date.day:02d}'
+
+
+def escape_text(text):
+    """Returns text escaped for an iCalendar TEXT value (RFC 5545, 3.3.11)."""
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\n', '\\n'))
+
+
+def iter_ics_lines(country, start_year, end_year, now):
+    """
+    Yields the lines of an iCalendar feed of holidays.
+
+    Args:
+        country (str): The name of the country (e.g., 'Japan').
+        start_year (int): The first year to export.
+        end_year (int): The last year to export (inclusive).
+        now (datetime.datetime): The export time, used as the DTSTAMP of
+            every event.
+
+    Yields:
+        str: The lines of the feed, without line endings.
+    """
+    key = country.lower()
+    stamp = now.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield f'PRODID:{PRODID}'
+    yield 'CALSCALE:GREGORIAN'
+    yield 'METHOD:PUBLISH'
+    yield f'X-WR-CALNAME:Holidays ({country})'
+
+    one_day = datetime.timedelta(days=1)
+    for chunk_start in range(start_year, end_year + 1, CHUNK_YEARS):
+        chunk_end = min(chunk_start + CHUNK_YEARS - 1, end_year)
+        for holiday in hcal_holidays.get_holiday_records(country, chunk_start, chunk_end):
+            date = holiday.date
+            start = format_date(date)
+            yield 'BEGIN:VEVENT'
+            yield f'UID:{start}-{key}@hcal'
+            yield f'DTSTAMP:{stamp}'
+            yield f'DTSTART;VALUE=DATE:{start}'
+            yield f'DTEND;VALUE=DATE:{format_date(date + one_day)}'
+            yield f'SUMMARY:{escape_text(holiday.name)}'
+            yield 'TRANSP:TRANSPARENT'
+            yield 'END:VEVENT'
+
+    yield 'END:VCALENDAR'
+
+
+def write_ics(out, country, start_year, end_year, now):
+    """
+    Streams an iCalendar feed of holidays into an OutputBuffer.
+
+    Args:
+        out (OutputBuffer): The buffer receiving the feed; it writes out
+            whenever its limit is reached.
+        country (str): The name of the country (e.g., 'Japan').
+        start_year (int): The first year to export.
+        end_year (int): The last year to export (inclusive).
+        now (datetime.datetime): The export time.
+    """
+    for line in iter_ics_lines(country, start_year, end_year, now):
+        out.write(line + CRLF)
@@ -0,0 +1,144 @@
+"""
+Per-phase timing for `hcal --profile`.
+
+While a Profiler is installed, the functions that start each phase of an
+invocation are wrapped so that their wall time is accumulated under that
+phase. Time is exclusive: a holiday computation triggered while rendering
+a month is counted as holiday time, not rendering time. Nothing is wrapped
+unless --profile is given.
+"""
+import contextlib
+import functools
+import sys
+import time
+
+import hcal_cli
+import hcal_util
+
+# Phases in report order.
+PHASES = ('parse', 'config', 'infer', 'holidays', 'render', 'layout', 'output')
+
+# (owner, attribute, phase) for every function that starts a phase.
+INSTRUMENTED = (
+    (hcal_cli, 'read_config', 'config'),
+    (hcal_cli, 'infer_year_month', 'infer'),
+    (hcal_util, 'get_holidays', 'holidays'),
+    (hcal_util.HighlightCalendar, 'formatmonth_lines', 'render'),
+    (hcal_util.HighlightCalendar, 'formatweek_line', 'render'),
+    (hcal_util.HighlightCalendar, 'month_lines', 'layout'),
+    (hcal_util.HighlightCalendar, 'formatmonth', 'layout'),
+    (hcal_cli, 'print_month_list', 'layout'),
+    (hcal_util.OutputBuffer, 'flush', 'output'),
+)
+
+
+class Profiler:
+    """
+    Accumulates exclusive wall time and call counts per phase.
+    """
+
+    def __init__(self):
+        """Initializes the Profiler."""
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.started = time.perf_counter()
+        self._stack = []
+
+    def add(self, name, seconds):
+        """Records time spent in a phase outside of any wrapped function."""
+        self.totals[name] += seconds
+        self.calls[name] += 1
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Times the body as phase name, pausing the enclosing phase."""
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.totals[parent[0]] += now - parent[1]
+        entry = [name, now]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.totals[name] += now - entry[1]
+            self.calls[name] += 1
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def _wrap(self, func, name):
+        """Returns func timed as phase name."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return timed
+
+    @contextlib.contextmanager
+    def instrument(self):
+        """Wraps the INSTRUMENTED functions for the duration of the body."""
+        originals = []
+        try:
+            for owner, attribute, name in INSTRUMENTED:
+                func = owner.__dict__[attribute]
+                originals.append((owner, attribute, func))
+                setattr(owner, attribute, self._wrap(func, name))
+            yield self
+        finally:
+            for owner, attribute, func in reversed(originals):
+                setattr(owner, attribute, func)
+
+    def report(self, stream):
+        """
+        Writes the per-phase breakdown.
+
+        Args:
+            stream (io.TextIOBase): Where to write the report (normally stderr).
+        """
+        total = time.perf_counter() - self.started
+        other = max(0.0, total - sum(self.totals.values()))
+        stream.write("hcal profile (wall time, ms):\n")
+        for name in PHASES:
+            stream.write(f"  {name:<10}{self.totals[name] * 1000:10.3f}"
+                         f"  ({self.calls[name]} calls)\n")
+        stream.write(f"  {'other':<10}{other * 1000:10.3f}\n")
+        stream.write(f"  {'total':<10}{total * 1000:10.3f}\n")
+
+
+def profile_main(args, parse_seconds, run_main):
+    """
+    Runs run_main() under a Profiler and writes the report to stderr.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        parse_seconds (float): Time spent parsing the arguments.
+        run_main (callable): Reads the configuration and writes the output.
+    """
+    c_profile = None
+    if args.profile_dump:
+        import cProfile  # pylint: disable=import-outside-toplevel
+        c_profile = cProfile.Profile()
+
+    profiler = Profiler()
+    profiler.started -= parse_seconds
+    profiler.add('parse', parse_seconds)
+
+    try:
+        with profiler.instrument():
+            if c_profile is not None:
+                c_profile.enable()
+            try:
+                run_main()
+            finally:
+                if c_profile is not None:
+                    c_profile.disable()
+    finally:
+        profiler.report(sys.stderr)
+        if c_profile is not None:
+            try:
+                c_profile.dump_stats(args.profile_dump)
+            except OSError as error:
+                print(f"hcal: cannot write {args.profile_dump}: {error.strerror}",
+                      file=sys.stderr)
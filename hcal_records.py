@@ -0,0 +1,82 @@
+"""
+Per-day records for `hcal --format json|jsonl|csv`.
+
+Records are generated month by month and written as they are produced, so
+multi-decade selections can be piped into other tools without building the
+text calendar or holding the whole range in memory.
+"""
+import calendar
+import json
+
+import hcal_util
+
+# Record fields, in output order.
+FIELDS = ('date', 'weekday', 'julian', 'is_weekend', 'is_holiday', 'is_today')
+
+
+def iter_day_records(months, country, today):
+    """
+    Yields one record per day of the selected months.
+
+    Args:
+        months (iterable): The (year, month) pairs to cover, in order.
+        country (str): The country whose holidays are flagged, or None.
+        today (datetime.date): The date flagged as today.
+
+    Yields:
+        dict: The date (YYYY-MM-DD), the ISO weekday (1=Monday, 7=Sunday),
+        the day of the year and the weekend, holiday and today flags.
+    """
+    today = (today.year, today.month, today.day)
+    for year, month in months:
+        holidays = hcal_util.get_holidays(country, year) if country else frozenset()
+        weekday, days = calendar.monthrange(year, month)
+        julian = hcal_util.DAYS_BEFORE_MONTH[month] + (month > 2 and calendar.isleap(year))
+        for day in range(1, days + 1):
+            yield {
+                'date': f'{year:04d}-{month:02d}-{day:02d}',
+                'weekday': weekday + 1,
+                'julian': julian + day,
+                'is_weekend': weekday >= calendar.SATURDAY,
+                'is_holiday': (month, day) in holidays,
+                'is_today': (year, month, day) == today,
+            }
+            weekday = (weekday + 1) % 7
+
+
+def _csv_value(value):
+    """Returns a record value as a CSV field."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def write_records(out, output_format, months, country, today):
+    """
+    Streams the day records of the selected months into an OutputBuffer.
+
+    Args:
+        out (OutputBuffer): The buffer receiving the records.
+        output_format (str): 'json' (one array), 'jsonl' (one object per
+            line) or 'csv' (with a header line).
+        months (iterable): The (year, month) pairs to cover, in order.
+        country (str): The country whose holidays are flagged, or None.
+        today (datetime.date): The date flagged as today.
+    """
+    if output_format == 'csv':
+        out.line(','.join(FIELDS))
+
+    separator = '[\n'
+    for year, month in months:
+        for record in iter_day_records(((year, month),), country, today):
+            if output_format == 'csv':
+                out.line(','.join(_csv_value(record[field]) for field in FIELDS))
+            elif output_format == 'jsonl':
+                out.line(json.dumps(record))
+            else:
+                out.write(separator + json.dumps(record))
+                separator = ',\n'
+        out.end_block()
+
+    if output_format == 'json':
+        out.line('[]' if separator == '[\n' else '\n]')
@@ -0,0 +1,113 @@
+"""
+Work counters for `hcal --stats` and the HCAL_STATS_LOG log file.
+
+The counters themselves are plain integers incremented on the hot paths of
+hcal_util and hcal_holidays; this module only reads them (together with the
+LRU cache statistics) before and after an invocation and reports the
+difference. Work done in --jobs worker processes is sent back with their
+results and added with add_worker_counters.
+"""
+import collections
+import datetime
+import json
+import sys
+
+import hcal_util
+
+# Counters of the work done in worker processes, included in every snapshot.
+WORKER_COUNTERS = collections.Counter()
+
+
+def snapshot():
+    """
+    Returns the current value of every counter.
+
+    hcal_holidays is not imported just to read its counters: an invocation
+    that never needed holidays reports zeros for them.
+
+    Returns:
+        dict: Counter name to value, in report order.
+    """
+    counters = {'cells_formatted': hcal_util.COUNTERS['cells_formatted']}
+
+    holidays = sys.modules.get('hcal_holidays')
+    if holidays is not None:
+        counters.update(holidays.COUNTERS)
+        cache = holidays.holiday_cache_info()
+        counters['holiday_cache_hits'] = cache.hits
+        counters['holiday_cache_misses'] = cache.misses
+    else:
+        counters.update(holiday_lookups=0, holiday_computations=0, holiday_store_hits=0,
+                        holiday_cache_hits=0, holiday_cache_misses=0)
+
+    cache = hcal_util.month_cache_info()
+    counters['month_cache_hits'] = cache.hits
+    counters['month_cache_misses'] = cache.misses
+    counters['lines_padded'] = hcal_util.COUNTERS['lines_padded']
+    counters['bytes_written'] = hcal_util.COUNTERS['bytes_written']
+    for name, value in WORKER_COUNTERS.items():
+        counters[name] += value
+    return counters
+
+
+def add_worker_counters(counters):
+    """
+    Adds the work reported by a worker process to the counters.
+
+    Args:
+        counters (dict): Counter name to increase, as returned by since().
+    """
+    WORKER_COUNTERS.update(counters)
+
+
+def since(before):
+    """
+    Returns how much each counter grew since an earlier snapshot.
+
+    Args:
+        before (dict): A snapshot taken earlier.
+
+    Returns:
+        dict: Counter name to increase.
+    """
+    return {name: value - before.get(name, 0) for name, value in snapshot().items()}
+
+
+def append_log(path, argv, counters):
+    """
+    Appends the counters of one invocation to a log file as a JSON line.
+
+    Args:
+        path (str): The log file.
+        argv (list): The command-line arguments of the invocation.
+        counters (dict): The counters to record.
+    """
+    record = {'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+              'argv': list(argv)}
+    record.update(counters)
+    try:
+        with open(path, 'a', encoding='utf-8') as log_file:
+            log_file.write(json.dumps(record) + '\n')
+    except OSError as error:
+        print(f"hcal: cannot write {path}: {error.strerror}", file=sys.stderr)
+
+
+def stats_main(args, argv, log_path, run_main):
+    """
+    Runs run_main() and reports the work it did.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        argv (list): The command-line arguments.
+        log_path (str): The log file to append to, or None.
+        run_main (callable): Reads the configuration and writes the output.
+    """
+    before = snapshot()
+    try:
+        run_main()
+    finally:
+        counters = since(before)
+        if args.stats:
+            print(json.dumps(counters), file=sys.stderr)
+        if log_path:
+            append_log(log_path, argv, counters)
@@ -2,9 +2,8 @@
 Utility functions and classes for hcal.
 """
 import calendar
-import datetime
+import functools
 import os
-from hcal_holidays import get_holidays
 
 ANSI_COLORS = {
     'red': '\033[31m',
@@ -20,6 +19,209 @@ DAYS_IN_WEEK = 7
 JULIAN_COL_WIDTH = 3
 DEFAULT_COL_WIDTH = 2
 
+# Buffered output is written out once it grows past this many characters.
+OUTPUT_BUFFER_LIMIT = 64 * 1024
+
+# Number of rendered month blocks kept by the LRU cache (a 12-year span).
+MONTH_CACHE_SIZE = 144
+
+# Days before the first of each month in a common year (index 1 = January).
+DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+MAX_DAYS_IN_MONTH = 31
+
+# Header lines (month name and weekday names) preceding the weeks of a month.
+MONTH_HEADER_LINES = 2
+
+
+ANSI_RESET = '\033[0m'
+TODAY_STYLE = '\033[47;30m'  # White background (47), Black text (30) for contrast
+SUNDAY_STYLE = '\033[31m'  # Red
+SATURDAY_STYLE = '\033[34m'  # Blue
+
+# Work counters reported by `hcal --stats` (see hcal_stats).
+COUNTERS = {'cells_formatted': 0, 'lines_padded': 0, 'bytes_written': 0}
+
+ANSI_ESCAPE_PATTERN = r'\x1B(?:[@-Z\\_-]|\[[0-?]*[ -/]*[@-~])'
+
+
+@functools.lru_cache(maxsize=None)
+def _ansi_escape():
+    """Returns the compiled ANSI escape pattern, importing re on first use."""
+    import re  # pylint: disable=import-outside-toplevel
+    return re.compile(ANSI_ESCAPE_PATTERN)
+
+
+def strip_ansi(text):
+    """
+    Strips ANSI escape codes from text.
+
+    Only needed for text that did not come from the Segment model, such as
+    captured command output.
+    """
+    return _ansi_escape().sub('', text)
+
+
+@functools.lru_cache(maxsize=None)
+def julian_labels(month, leap, width):
+    """
+    Returns the preformatted day-of-year labels of a month.
+
+    Args:
+        month (int): The month.
+        leap (bool): Whether the year is a leap year.
+        width (int): The column width to right-justify to.
+
+    Returns:
+        tuple: The labels indexed by day of month (index 0 is unused).
+    """
+    first = DAYS_BEFORE_MONTH[month] + (1 if leap and month > 2 else 0)
+    return ('',) + tuple(str(first + day).rjust(width)
+                         for day in range(1, MAX_DAYS_IN_MONTH + 1))
+
+
+def get_holidays(country, year):
+    """
+    Returns the holidays of a country and year from hcal_holidays.
+
+    The holiday module is imported on first use, so calendars without a
+    country never load it.
+    """
+    import hcal_holidays  # pylint: disable=import-outside-toplevel
+    # Importing the store makes hcal_holidays use tables written by --warm-cache
+    import hcal_holiday_store  # pylint: disable=import-outside-toplevel, unused-import
+    return hcal_holidays.get_holidays(country, year)
+
+
+class Segment:
+    """
+    A run of text rendered with a single ANSI style.
+
+    Attributes:
+        text (str): The visible characters.
+        style (str): The ANSI escape sequence, or '' for plain text.
+    """
+    __slots__ = ('text', 'style')
+
+    def __init__(self, text, style=''):
+        self.text = text
+        self.style = style
+
+    @property
+    def width(self):
+        """Returns the visible width of the segment."""
+        return len(self.text)
+
+    def render(self):
+        """Returns the segment with its escape codes."""
+        if self.style:
+            return f"{self.style}{self.text}{ANSI_RESET}"
+        return self.text
+
+
+class Line:
+    """
+    A line of output made of segments with a known visible width.
+    """
+    __slots__ = ('segments', 'width')
+
+    def __init__(self, segments=()):
+        self.segments = list(segments)
+        self.width = sum(segment.width for segment in self.segments)
+
+    def append(self, segment):
+        """Appends a segment to the line."""
+        self.segments.append(segment)
+        self.width += segment.width
+
+    def rstrip(self):
+        """Removes trailing unstyled whitespace, like str.rstrip on the rendered line."""
+        while self.segments and not self.segments[-1].style:
+            last = self.segments[-1]
+            text = last.text.rstrip()
+            self.width -= len(last.text) - len(text)
+            if text:
+                last.text = text
+                break
+            self.segments.pop()
+        return self
+
+    def pad(self, width):
+        """Pads the line with spaces to reach the specified visible width."""
+        if self.width < width:
+            self.append(Segment(' ' * (width - self.width)))
+            COUNTERS['lines_padded'] += 1
+        return self
+
+    def render(self):
+        """Returns the line with its escape codes."""
+        return ''.join(segment.render() for segment in self.segments)
+
+
+class OutputBuffer:
+    """
+    Collects output lines and writes them to a stream in a few large writes.
+
+    Text streams backed by a binary buffer (such as sys.stdout or a file
+    opened in text mode) are written to through that buffer directly.
+    """
+
+    def __init__(self, stream, flush_blocks=False, limit=OUTPUT_BUFFER_LIMIT):
+        """
+        Initializes the OutputBuffer.
+
+        Args:
+            stream (io.TextIOBase): The stream to write to.
+            flush_blocks (bool): Whether to write out after every block of
+                output (for interactive use) instead of only when full.
+            limit (int): The number of buffered characters that triggers a write.
+        """
+        self.stream = stream
+        self.flush_blocks = flush_blocks
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+
+    def line(self, text=''):
+        """Appends a line of text followed by a newline."""
+        self.parts.append(text)
+        self.parts.append('\n')
+        self.size += len(text) + 1
+        if self.size >= self.limit:
+            self.flush()
+
+    def write(self, text):
+        """Appends text that already contains its newlines."""
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.limit:
+            self.flush()
+
+    def end_block(self):
+        """Marks the end of a block of output, writing it out if flush_blocks is set."""
+        if self.flush_blocks:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered text to the stream with a single write."""
+        if not self.parts:
+            return
+        text = ''.join(self.parts)
+        self.parts.clear()
+        self.size = 0
+
+        binary = getattr(self.stream, 'buffer', None)
+        if binary is not None:
+            # Keep ordering with anything already written through the text layer
+            self.stream.flush()
+            data = text.encode(self.stream.encoding or 'utf-8', 'replace')
+            binary.write(data)
+            binary.flush()
+            COUNTERS['bytes_written'] += len(data)
+        else:
+            self.stream.write(text)
+            self.stream.flush()
+            COUNTERS['bytes_written'] += len(text.encode('utf-8', 'replace'))
+
 
 def read_config(file_path):
     """
@@ -76,6 +278,9 @@ class HighlightCalendar(calendar.TextCalendar):
         self.curr_y = 0
         self.curr_m = 0
         self.holidays = set()
+        self.julian_labels = None
+        self.julian_width = 0
+        self.holiday_color = holiday_color.lower()
         self.holiday_color_code = ANSI_COLORS.get(holiday_color.lower(), ANSI_COLORS['red'])
         self.julian = julian
 
@@ -96,9 +301,27 @@ class HighlightCalendar(calendar.TextCalendar):
 
         self.month_width = col_width * DAYS_IN_WEEK + spaces_in_week_line
 
-    def formatday(self, day, weekday, width):
+    def start_month(self, theyear, themonth):
         """
-        Returns a formatted string for a single day.
+        Prepares the per-month state used by formatday_segment.
+
+        Fetches the holidays of the year and resets the Julian labels, which
+        are looked up from a per-month table instead of being computed for
+        every cell.
+
+        Args:
+            theyear (int): The year.
+            themonth (int): The month.
+        """
+        self.curr_y = theyear
+        self.curr_m = themonth
+        if self.country:
+            self.holidays = get_holidays(self.country, theyear)
+        self.julian_width = 0
+
+    def formatday_segment(self, day, weekday, width):
+        """
+        Returns a single day as a styled segment.
 
         Highlights the current day, weekends, and holidays with ANSI color codes.
 
@@ -108,41 +331,94 @@ class HighlightCalendar(calendar.TextCalendar):
             width (int): The width of the column.
 
         Returns:
-            str: The formatted day string.
+            Segment: The formatted day.
         """
         if self.julian and day > 0:
-            date_obj = datetime.date(self.curr_y, self.curr_m, day)
-            day_str = str(date_obj.timetuple().tm_yday).rjust(width)
+            if width != self.julian_width:
+                self.julian_labels = julian_labels(self.curr_m, calendar.isleap(self.curr_y),
+                                                   width)
+                self.julian_width = width
+            day_str = self.julian_labels[day]
         else:
             day_str = super().formatday(day, weekday, width)
 
         if day == 0:
-            return day_str
+            return Segment(day_str)
 
         # Check if this is today
         if (self.highlight_today and self.today and
                 self.curr_y == self.today.year and
                 self.curr_m == self.today.month and
                 day == self.today.day):
-            # White background (47), Black text (30) for contrast
-            return f"\033[47;30m{day_str}\033[0m"
+            return Segment(day_str, TODAY_STYLE)
 
-        # Check for Holidays
-        if self.country:
-            # Refresh holidays if year changes (though formatmonth sets curr_y)
-            # Optimization: We could cache this, but it's cheap to fetch for now.
-            self.holidays = get_holidays(self.country, self.curr_y)
-
-            if (self.curr_m, day) in self.holidays:
-                return f"{self.holiday_color_code}{day_str}\033[0m"
+        # Check for Holidays (fetched once per month in start_month)
+        if (self.curr_m, day) in self.holidays:
+            return Segment(day_str, self.holiday_color_code)
 
         # Weekend coloring
         if weekday == calendar.SUNDAY:
-            return f"\033[31m{day_str}\033[0m"  # Red
+            return Segment(day_str, SUNDAY_STYLE)
         if weekday == calendar.SATURDAY:
-            return f"\033[34m{day_str}\033[0m"  # Blue
+            return Segment(day_str, SATURDAY_STYLE)
+
+        return Segment(day_str)
+
+    def formatday(self, day, weekday, width):
+        """
+        Returns a formatted string for a single day.
+
+        Args:
+            day (int): The day number.
+            weekday (int): The day of the week (0=Monday, 6=Sunday).
+            width (int): The width of the column.
+
+        Returns:
+            str: The formatted day string.
+        """
+        return self.formatday_segment(day, weekday, width).render()
+
+    def formatweek_line(self, theweek, width):
+        """
+        Returns a single week as a Line, with trailing blanks removed.
+
+        Args:
+            theweek (list): The (day, weekday) pairs of the week.
+            width (int): The width of the columns.
+
+        Returns:
+            Line: The formatted week.
+        """
+        COUNTERS['cells_formatted'] += len(theweek)
+        line = Line()
+        for i, (day, weekday) in enumerate(theweek):
+            if i:
+                line.append(Segment(' '))
+            line.append(self.formatday_segment(day, weekday, width))
+        return line.rstrip()
+
+    def formatmonth_lines(self, theyear, themonth, w=0):
+        """
+        Returns a month as a list of Lines.
+
+        Args:
+            theyear (int): The year.
+            themonth (int): The month.
+            w (int): Width of date columns.
+
+        Returns:
+            list: The month name, weekday header and week lines.
+        """
+        w = max(2, w)
+        self.start_month(theyear, themonth)
 
-        return day_str
+        lines = [
+            Line([Segment(self.formatmonthname(theyear, themonth, 7 * (w + 1) - 1))]).rstrip(),
+            Line([Segment(self.formatweekheader(w))]).rstrip(),
+        ]
+        for week in self.monthdays2calendar(theyear, themonth):
+            lines.append(self.formatweek_line(week, w))
+        return lines
 
     def formatmonth(self, theyear, themonth, w=0, l=0):
         """
@@ -157,6 +433,61 @@ class HighlightCalendar(calendar.TextCalendar):
         Returns:
             str: The formatted month string.
         """
-        self.curr_y = theyear
-        self.curr_m = themonth
-        return super().formatmonth(theyear, themonth, w, l)
+        separator = '\n' * max(1, l)
+        return ''.join(line.render() + separator
+                       for line in self.formatmonth_lines(theyear, themonth, w))
+
+    def month_lines(self, theyear, themonth):
+        """
+        Returns the month as a list of lines padded to month_width.
+
+        The block without today's highlight comes from a cache shared by all
+        calendars with the same style; today's highlight is then patched
+        onto the single week row that contains it.
+
+        Args:
+            theyear (int): The year.
+            themonth (int): The month.
+
+        Returns:
+            list: The padded lines of the month.
+        """
+        country = self.country.lower() if self.country else None
+        lines = list(_render_month_block(self.firstweekday, theyear, themonth, self.julian,
+                                         country, self.holiday_color))
+
+        if (self.highlight_today and self.today and
+                self.today.year == theyear and self.today.month == themonth):
+            self.start_month(theyear, themonth)
+            for row, week in enumerate(self.monthdays2calendar(theyear, themonth)):
+                if any(day == self.today.day for day, _ in week):
+                    week_line = self.formatweek_line(week, self.formatmonth_w)
+                    lines[MONTH_HEADER_LINES + row] = week_line.pad(self.month_width).render()
+                    break
+        return lines
+
+
+@functools.lru_cache(maxsize=MONTH_CACHE_SIZE)
+def _render_month_block(firstweekday, year, month, julian, country, holiday_color):
+    """Renders a month without today's highlight as a tuple of padded lines."""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    cal = HighlightCalendar(firstweekday, country=country, highlight_today=False,
+                            holiday_color=holiday_color, julian=julian)
+    return tuple(line.pad(cal.month_width).render()
+                 for line in cal.formatmonth_lines(year, month, w=cal.formatmonth_w))
+
+
+def month_cache_info():
+    """
+    Returns the hit/miss statistics of the rendered month cache.
+
+    Returns:
+        functools._CacheInfo: Named tuple with hits, misses, maxsize and currsize.
+    """
+    # pylint sees the wrapped function's parameters on the lru_cache wrapper
+    return _render_month_block.cache_info()  # pylint: disable=no-value-for-parameter
+
+
+def clear_month_cache():
+    """Empties the rendered month cache and resets its statistics."""
+    _render_month_block.cache_clear()
@@ -1,10 +1,12 @@
 """
 Common utilities for hcal tests.
 """
-import re
+import contextlib
+import io
 import subprocess
-import sys
 import unittest
+from hcal_cli import render
+from hcal_util import strip_ansi
 
 class HcalTestCase(unittest.TestCase):
     """Base class for hcal tests with common helpers."""
@@ -12,13 +14,27 @@ class HcalTestCase(unittest.TestCase):
     @staticmethod
     def strip_ansi(text):
         """Helper to strip ANSI escape codes."""
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\_-]|\[[0-?]*[ -/]*[@-~])')
-        return ansi_escape.sub('', text)
+        return strip_ansi(text)
 
     def run_hcal(self, *args, check=True):
-        """Runs hcal with the given arguments and returns the result."""
-        cmd = [sys.executable, "./hcal"] + list(args)
-        return subprocess.run(cmd, capture_output=True, text=True, check=check)
+        """
+        Runs hcal in-process with the given arguments and returns the result.
+
+        The result mirrors subprocess.run(..., capture_output=True, text=True).
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                render(args, stream=stdout)
+                returncode = 0
+            except SystemExit as error:
+                returncode = error.code if isinstance(error.code, int) else 1
+        result = subprocess.CompletedProcess(["hcal"] + list(args), returncode,
+                                             stdout.getvalue(), stderr.getvalue())
+        if check:
+            result.check_returncode()
+        return result
 
     def assert_visual_length(self, line, expected_length):
         """Asserts that a line has a certain visual length (excluding ANSI codes)."""
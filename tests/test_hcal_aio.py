@@ -0,0 +1,90 @@
+"""
+Tests for the asyncio API.
+"""
+import asyncio
+import datetime
+import threading
+import unittest
+from unittest import mock
+
+import hcal_aio
+import hcal_cli
+from hcal_holidays import get_holidays
+
+TODAY = datetime.date(2024, 5, 15)
+CONFIG = {'country': 'Japan'}
+
+
+class TestHcalAio(unittest.IsolatedAsyncioTestCase):
+    """Test cases for hcal_aio."""
+
+    async def test_render_month_matches_cli(self):
+        """Test that render_month renders exactly like the command line."""
+        output = await hcal_aio.render_month(2024, 5, config=CONFIG, today=TODAY, julian=True)
+        self.assertEqual(output, hcal_cli.render(["-j", "5", "2024"], today=TODAY, config=CONFIG))
+
+    async def test_render_range_matches_cli(self):
+        """Test that render_range renders months and years like the command line."""
+        output = await hcal_aio.render_range(2024, 5, after=2, before=1, config=CONFIG,
+                                             today=TODAY, highlight_today=False)
+        self.assertEqual(output, hcal_cli.render(["-h", "-A", "2", "-B", "1", "5", "2024"],
+                                                 today=TODAY, config=CONFIG))
+        output = await hcal_aio.render_range(2024, config=CONFIG, today=TODAY)
+        self.assertEqual(output, hcal_cli.render(["-y", "2024"], today=TODAY, config=CONFIG))
+
+    async def test_invalid_arguments(self):
+        """Test that invalid months and counts raise ValueError."""
+        with self.assertRaises(ValueError):
+            await hcal_aio.render_month(2024, 13)
+        with self.assertRaises(ValueError):
+            await hcal_aio.render_range(2024, 1, after=-1)
+
+    async def test_holidays(self):
+        """Test that holidays returns the named holidays of the years."""
+        records = await hcal_aio.holidays('Japan', 2024, 2025)
+        self.assertEqual(len(records),
+                         len(get_holidays('Japan', 2024)) + len(get_holidays('Japan', 2025)))
+        self.assertEqual(next(iter(records)).name, "New Year's Day")
+
+    async def test_concurrent_identical_calls_are_single_flighted(self):
+        """Test that identical concurrent calls share one computation."""
+        release = threading.Event()
+        calls = []
+        render = hcal_cli.render
+
+        def slow_render(argv, today=None, config=None):
+            calls.append(argv)
+            release.wait(5)
+            return render(argv, today=today, config=config)
+
+        with mock.patch('hcal_cli.render', slow_render):
+            tasks = [asyncio.create_task(hcal_aio.render_month(2024, 5, config=CONFIG,
+                                                               today=TODAY))
+                     for _ in range(10)]
+            other = asyncio.create_task(hcal_aio.render_month(2024, 6, config=CONFIG,
+                                                              today=TODAY))
+            await asyncio.sleep(0.05)
+            # A cancelled caller does not cancel the shared computation
+            tasks[0].cancel()
+            release.set()
+            results = await asyncio.gather(*tasks[1:], other)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(set(results[:-1])), 1)
+        self.assertNotEqual(results[0], results[-1])
+        self.assertTrue(tasks[0].cancelled())
+        self.assertEqual(hcal_aio._in_flight, {})  # pylint: disable=protected-access
+
+    async def test_failures_reach_every_caller(self):
+        """Test that an error is raised to every waiter and not remembered."""
+        with mock.patch('hcal_cli.render', side_effect=RuntimeError("boom")):
+            results = await asyncio.gather(
+                *(hcal_aio.render_month(2024, 5, config=CONFIG, today=TODAY) for _ in range(3)),
+                return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        output = await hcal_aio.render_month(2024, 5, config=CONFIG, today=TODAY)
+        self.assertIn("May 2024", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
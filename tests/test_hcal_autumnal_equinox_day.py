@@ -31,6 +31,16 @@ class TestHcalAutumnalEquinoxDay(unittest.TestCase):
         holidays_2025 = get_holidays('Japan', 2025)
         self.assertIn((9, 23), holidays_2025)
 
+    def test_autumnal_equinox_after_2099(self):
+        """Test dates from the precomputed table after 2099."""
+        # 2107: September 23 (the formula says the 24th; the equinox is at 23:36 JST)
+        holidays_2107 = get_holidays('Japan', 2107)
+        self.assertIn((9, 23), holidays_2107)
+        self.assertNotIn((9, 24), holidays_2107)
+
+        # 2200: September 23
+        self.assertIn((9, 23), get_holidays('Japan', 2200))
+
     def test_autumnal_equinox_pre_1955(self):
         """Test dates before 1955 (should be None/not present)."""
         # Should not be present before 1955
@@ -0,0 +1,91 @@
+"""
+Tests for business-day arithmetic.
+"""
+import contextlib
+import datetime
+import io
+import unittest
+
+from hcal_business import BusinessCalendar
+from hcal_cli import render
+from tests.hcal_test_base import HcalTestCase
+
+
+class TestBusinessCalendar(unittest.TestCase):
+    """Test cases for the BusinessCalendar engine."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.japan = BusinessCalendar('Japan', 2019, 2025)
+        cls.weekends_only = BusinessCalendar(None, 2024, 2024)
+
+    def test_is_business_day(self):
+        """Test weekends, holidays and substitute holidays."""
+        self.assertTrue(self.japan.is_business_day(datetime.date(2024, 2, 9)))
+        self.assertFalse(self.japan.is_business_day(datetime.date(2024, 2, 10)))  # Saturday
+        self.assertFalse(self.japan.is_business_day(datetime.date(2024, 2, 12)))  # Substitute
+        self.assertTrue(self.weekends_only.is_business_day(datetime.date(2024, 2, 12)))
+
+    def test_business_days_between(self):
+        """Test counting across Golden Week 2024."""
+        start = datetime.date(2024, 4, 26)
+        end = datetime.date(2024, 5, 10)
+        self.assertEqual(self.japan.business_days_between(start, end), 7)
+        self.assertEqual(self.japan.business_days_between(end, start), -7)
+        self.assertEqual(self.weekends_only.business_days_between(start, end), 10)
+
+    def test_add_business_days(self):
+        """Test moving forward and backward over holidays."""
+        friday = datetime.date(2024, 4, 26)
+        self.assertEqual(self.japan.add_business_days(friday, 1), datetime.date(2024, 4, 30))
+        self.assertEqual(self.japan.add_business_days(friday, 5), datetime.date(2024, 5, 8))
+        self.assertEqual(self.japan.add_business_days(datetime.date(2024, 5, 7), -1),
+                         datetime.date(2024, 5, 2))
+        self.assertEqual(self.japan.add_business_days(friday, 0), friday)
+
+    def test_offsets_agree_with_counts(self):
+        """Test that offsetting and counting are inverse operations."""
+        start = datetime.date(2020, 1, 6)  # A business day
+        for days in (1, 17, 250, 1000):
+            target = self.japan.add_business_days(start, days)
+            self.assertEqual(self.japan.business_days_between(start, target), days)
+            self.assertTrue(self.japan.is_business_day(target))
+
+    def test_outside_span(self):
+        """Test that dates outside the covered years raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.japan.is_business_day(datetime.date(2026, 1, 5))
+        with self.assertRaises(ValueError):
+            self.japan.add_business_days(datetime.date(2025, 12, 30), 5)
+
+
+class TestHcalBusinessDaysOption(HcalTestCase):
+    """Tests for the --business-days option."""
+
+    def test_business_days_option(self):
+        """Test counting over two weeks without holidays."""
+        result = self.run_hcal("--business-days", "2024-06-03", "2024-06-17")
+        self.assertEqual(result.stdout.strip(), "10")
+
+    def test_business_days_without_country(self):
+        """Test that counting without a configured country warns that holidays are ignored."""
+        argv = ["--business-days", "2024-04-29", "2024-05-07"]
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(render(argv, config={}), "6\n")
+        self.assertIn("no country", stderr.getvalue())
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(render(argv, config={'country': 'Japan'}), "3\n")
+        self.assertEqual(stderr.getvalue(), "")
+
+    def test_business_days_invalid_date(self):
+        """Test that malformed dates are rejected."""
+        result = self.run_hcal("--business-days", "2024-06-03", "June", check=False)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("invalid date", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
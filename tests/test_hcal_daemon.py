@@ -0,0 +1,92 @@
+"""
+Tests for hcal daemon mode.
+"""
+import contextlib
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from hcal_daemon import DaemonServer, DaemonState, forward
+
+
+class TestHcalDaemon(unittest.TestCase):
+    """Test cases for serving renders over a Unix socket."""
+
+    def setUp(self):
+        """Start a daemon on a temporary socket with a temporary config."""
+        self.test_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.test_dir, "hcalrc")
+        self.write_config("country=Japan\n")
+        self.socket_path = os.path.join(self.test_dir, "hcal.sock")
+        self.state = DaemonState(self.config_path)
+        self.server = DaemonServer(self.socket_path, self.state)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the daemon and remove the temporary directory."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.test_dir)
+
+    def write_config(self, text):
+        """Writes the config file watched by the daemon."""
+        with open(self.config_path, "w", encoding="utf-8") as config_file:
+            config_file.write(text)
+
+    def forward(self, *argv):
+        """Forwards argv to the daemon, returning (status, stdout, stderr)."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = forward(self.socket_path, list(argv))
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_render_month(self):
+        """Test that the daemon renders holidays from its config."""
+        status, stdout, _ = self.forward("-h", "1", "2024")
+        self.assertEqual(status, 0)
+        self.assertIn("January 2024", stdout)
+        self.assertIn("\033[31m 1\033[0m", stdout)  # New Year's Day
+
+    def test_argument_errors(self):
+        """Test that usage errors are reported with status 2."""
+        status, _, stderr = self.forward("--bogus")
+        self.assertEqual(status, 2)
+        self.assertIn("unrecognized arguments", stderr)
+
+    def test_local_options_fall_back(self):
+        """Test that options touching the client's files are not served."""
+        self.assertIsNone(self.forward("--output", "calendar.txt")[0])
+        self.assertIsNone(self.forward("--warm-cache", "2000-2001")[0])
+
+    def test_daemon_down(self):
+        """Test that an unreachable daemon yields None."""
+        self.assertIsNone(forward(os.path.join(self.test_dir, "missing.sock"), ["1"]))
+
+    def test_config_change_invalidates_state(self):
+        """Test that editing the config file is picked up."""
+        self.forward("-h", "1", "2024")
+        self.write_config("country=Japan\nholiday_color=green\n")
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        _, stdout, _ = self.forward("-h", "1", "2024")
+        self.assertIn("\033[32m 1\033[0m", stdout)
+
+    def test_midnight_invalidates_calendars(self):
+        """Test that calendars are dropped when the day changes."""
+        now = datetime.datetime(2024, 1, 1, 23, 59)
+        self.state.refresh(now)
+        self.state.calendars['marker'] = object()
+        self.state.refresh(now + datetime.timedelta(minutes=1))
+        self.assertEqual(self.state.calendars, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
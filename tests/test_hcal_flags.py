@@ -3,6 +3,7 @@ Tests for hcal command-line flags.
 """
 import datetime
 import unittest
+from hcal_cli import DEFAULT_ARGS, build_parser, parse_args
 from tests.hcal_test_base import HcalTestCase
 
 class TestHcalFlags(HcalTestCase):
@@ -44,5 +45,14 @@ class TestHcalFlags(HcalTestCase):
         self.assertTrue("\033[31m" in output or "\033[34m" in output,
                         "Weekend colors should still be present")
 
+    def test_fast_path_matches_parser(self):
+        """
+        Test that the fast path parses flags exactly like argparse.
+        """
+        parser = build_parser()
+        self.assertEqual(vars(parser.parse_args([])), DEFAULT_ARGS)
+        for argv in ([], ["-3"], ["-h", "-3"], ["-j", "-3", "-h"]):
+            self.assertEqual(vars(parse_args(argv)), vars(parser.parse_args(argv)))
+
 if __name__ == "__main__":
     unittest.main()
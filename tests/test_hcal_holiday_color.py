@@ -3,23 +3,19 @@ Test suite for hcal holiday color configuration.
 """
 import os
 import shutil
-import subprocess
-import sys
 import tempfile
 import unittest
+from tests.hcal_test_base import HcalTestCase
 
-class TestHcalHolidayColor(unittest.TestCase):
+class TestHcalHolidayColor(HcalTestCase):
     """Test cases for hcal holiday color customization."""
     def setUp(self):
-        """Set up a temporary HOME directory and define hcal path."""
+        """Set up a temporary HOME directory."""
         # Create a temporary directory for HOME
         self.test_dir = tempfile.mkdtemp()
         self.original_home = os.environ.get('HOME')
         os.environ['HOME'] = self.test_dir
 
-        # Path to hcal script
-        self.hcal_path = os.path.abspath("./hcal")
-
     def tearDown(self):
         """Clean up the temporary directory and restore HOME."""
         # Cleanup
@@ -35,8 +31,7 @@ class TestHcalHolidayColor(unittest.TestCase):
             config_file.write("holiday_color=green\n")
 
         # Run hcal for Jan 2024 (Jan 1 is holiday in JP, and it is a Monday)
-        cmd = [sys.executable, self.hcal_path, "1", "2024"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = self.run_hcal("1", "2024")
 
         # Jan 1 is New Year's Day, should be green (\033[32m)
         # Expected: \033[32m 1\033[0m
@@ -50,8 +45,7 @@ class TestHcalHolidayColor(unittest.TestCase):
             config_file.write("holiday_color=blue\n")
 
         # Run hcal for Jan 2024
-        cmd = [sys.executable, self.hcal_path, "1", "2024"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = self.run_hcal("1", "2024")
 
         # Jan 1 should be blue (\033[34m)
         self.assertIn("\033[34m 1\033[0m", result.stdout)
@@ -62,8 +56,7 @@ class TestHcalHolidayColor(unittest.TestCase):
         with open(os.path.join(self.test_dir, ".hcalrc"), "w", encoding="utf-8") as config_file:
             config_file.write("country=Japan\n")
 
-        cmd = [sys.executable, self.hcal_path, "1", "2024"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = self.run_hcal("1", "2024")
 
         # Jan 1 should be red (\033[31m)
         # Note: Jan 1 2024 is Monday, so it wouldn't be red unless it's a holiday.
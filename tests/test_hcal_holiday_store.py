@@ -0,0 +1,81 @@
+"""
+Tests for the persistent on-disk holiday table.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import hcal_holiday_store
+import hcal_holidays
+from hcal_holiday_store import HolidayStoreError, close_tables, lookup, warm
+from hcal_holidays import get_holidays
+
+
+class TestHolidayStore(unittest.TestCase):
+    """Test cases for writing and reading the holiday table."""
+
+    def setUp(self):
+        """Point the cache directory at a temporary location."""
+        self.test_dir = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.test_dir})
+        self.env.start()
+        close_tables()
+
+    def tearDown(self):
+        """Unmap the tables and remove the temporary directory."""
+        close_tables()
+        self.env.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_lookup_without_table(self):
+        """Test that lookups fall through when no table was written."""
+        self.assertIsNone(lookup('japan', 2024))
+
+    def test_warm_and_lookup(self):
+        """Test that stored years match the computed holidays."""
+        path = warm('Japan', 2000, 2030)
+        self.assertTrue(path.startswith(self.test_dir))
+
+        for year in (2000, 2020, 2030):
+            self.assertEqual(lookup('japan', year), get_holidays('Japan', year))
+        self.assertIsNone(lookup('japan', 1999))
+        self.assertIsNone(lookup('japan', 2031))
+
+    def test_rules_version_invalidates_table(self):
+        """Test that a table written by other rules is ignored."""
+        warm('Japan', 2020, 2021)
+        close_tables()
+        with mock.patch('hcal_holidays.RULES_VERSION', 999):
+            self.assertIsNone(lookup('japan', 2020))
+
+    def test_size_cap(self):
+        """Test that oversized ranges are rejected."""
+        with self.assertRaises(HolidayStoreError):
+            warm('Japan', 1, 9999)
+        with self.assertRaises(HolidayStoreError):
+            warm('Japan', 2030, 2020)
+
+    def test_warm_removes_stale_versions(self):
+        """Test that tables of older rule versions are pruned."""
+        os.makedirs(hcal_holiday_store.get_store_dir())
+        stale = os.path.join(hcal_holiday_store.get_store_dir(), 'holidays-japan-r0.bin')
+        with open(stale, 'wb') as stale_file:
+            stale_file.write(b'old')
+
+        warm('Japan', 2020, 2021)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_get_holidays_reads_table(self):
+        """Test that get_holidays consults the registered table before computing."""
+        warm('Japan', 2020, 2021)
+        hcal_holidays.clear_holiday_cache()
+        hits = hcal_holidays.COUNTERS['holiday_store_hits']
+        self.assertEqual(get_holidays('Japan', 2020), lookup('japan', 2020))
+        self.assertEqual(hcal_holidays.COUNTERS['holiday_store_hits'], hits + 1)
+        hcal_holidays.clear_holiday_cache()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,16 @@
 """
 Unit tests for hcal_holidays module.
 """
+import datetime
 import unittest
-from hcal_holidays import get_holidays, get_specific_monday
+from array import array
+from unittest import mock
+import hcal_holidays
+from hcal_holidays import (CITIZENS, COUNTRY_RULES, EQUINOX_TABLE_END, EQUINOX_TABLE_START,
+                           FIXED, SUBSTITUTE, VARIABLE, CountryRules, Holiday, HolidayIndex,
+                           clear_holiday_cache, equinox_day, equinox_formula_day, fixed,
+                           get_holiday_records, get_holidays, get_holidays_range,
+                           get_specific_monday, holiday_cache_info, nth_weekday)
 
 
 class TestJapanHolidays(unittest.TestCase):
@@ -111,5 +119,277 @@ class TestJapanHolidays(unittest.TestCase):
                          "December 23 should not be Emperor's Birthday in 2021")
 
 
+class TestHolidayRules(unittest.TestCase):
+    """
+    Unit tests for the declarative holiday rule tables.
+    """
+
+    def setUp(self):
+        # Also empties the cache of computed blocks of years, which would
+        # otherwise keep results of the tables patched in by other tests
+        clear_holiday_cache()
+
+    def tearDown(self):
+        clear_holiday_cache()
+
+    def test_new_country_is_a_table(self):
+        """Test that a country is defined by adding a rule table."""
+        rules = CountryRules(
+            rules=(
+                fixed("New Year", 1, 1),
+                fixed("Founding Day", 6, 1, first_year=2000, overrides=((2010, 6, 3),)),
+                nth_weekday("Harvest Day", 10, 3, 4, last_year=2020),
+            ),
+            bridge_from=None,
+            substitute_from=2015,
+        )
+        with mock.patch.dict(COUNTRY_RULES, {'testland': rules}):
+            self.assertEqual(get_holidays('Testland', 1999), {(1, 1), (10, 28)})
+            self.assertEqual(get_holidays('Testland', 2010), {(1, 1), (6, 3), (10, 28)})
+            # June 1, 2014 is a Sunday, before substitute holidays began
+            self.assertEqual(get_holidays('Testland', 2014), {(1, 1), (6, 1), (10, 23)})
+            # January 1, 2017 is a Sunday
+            self.assertEqual(get_holidays('Testland', 2017), {(1, 1), (1, 2), (6, 1), (10, 26)})
+            self.assertEqual(get_holidays('Testland', 2021), {(1, 1), (6, 1)})
+            self.assertEqual(len(get_holidays_range('Testland', 2014, 2017)), 13)
+
+    def test_compiled_rules_match_range(self):
+        """Test that the per-year evaluator agrees with the span evaluation."""
+        with mock.patch('hcal_holidays.import_numpy', return_value=None):
+            ordinals = list(get_holidays_range('Japan', 1900, 2200))
+        expected = sorted(datetime.date(year, month, day).toordinal()
+                          for year in range(1900, 2201)
+                          for month, day in hcal_holidays._compute_holidays('japan', year))  # pylint: disable=protected-access
+        self.assertEqual(ordinals, expected)
+
+    def test_policies_cross_year_boundaries(self):
+        """Test bridge and substitute holidays spilling over December 31."""
+        rules = CountryRules(
+            rules=(fixed("Eve", 12, 30), fixed("Last Day", 12, 31), fixed("New Year", 1, 2)),
+            bridge_from=None,
+            substitute_from=2000,
+        )
+        with mock.patch.dict(COUNTRY_RULES, {'testland': rules}):
+            # December 31, 2023 is a Sunday
+            self.assertEqual(get_holidays('Testland', 2024), {(1, 1), (1, 2), (12, 30), (12, 31)})
+        rules = CountryRules(
+            rules=(fixed("Eve", 12, 30), fixed("New Year", 1, 1)),
+            bridge_from=2000,
+            substitute_from=datetime.MINYEAR,
+        )
+        clear_holiday_cache()
+        with mock.patch.dict(COUNTRY_RULES, {'testland': rules}):
+            # Sunday, December 31, 2023 is not a bridge day, Tuesday, 2024 is
+            # (and Sunday, January 1, 2023 moves to January 2)
+            self.assertEqual(get_holidays('Testland', 2023), {(1, 1), (1, 2), (12, 30)})
+            self.assertEqual(get_holidays('Testland', 2024), {(1, 1), (12, 30), (12, 31)})
+
+    def test_none_disables_policies(self):
+        """Test that None turns the bridge and substitute policies off."""
+        rules = CountryRules(rules=(fixed("New Year", 1, 1), fixed("Third", 1, 3)),
+                             bridge_from=None, substitute_from=None)
+        with mock.patch.dict(COUNTRY_RULES, {'testland': rules}):
+            # Sunday, January 1, 2023 neither moves nor bridges to January 3
+            self.assertEqual(get_holidays('Testland', 2023), {(1, 1), (1, 3)})
+
+    def test_clearing_the_cache_picks_up_rule_changes(self):
+        """Test that clear_holiday_cache drops every year of a computed block."""
+        before = CountryRules(rules=(fixed("New Year", 1, 1),), bridge_from=None,
+                              substitute_from=None)
+        after = CountryRules(rules=(fixed("New Year", 1, 1), fixed("Spring Day", 4, 1)),
+                             bridge_from=None, substitute_from=None)
+        with mock.patch.dict(COUNTRY_RULES, {'testland': before}):
+            # 2024 and 2025 share a block of HOLIDAY_BLOCK_YEARS years
+            self.assertEqual(get_holidays('Testland', 2024), {(1, 1)})
+        with mock.patch.dict(COUNTRY_RULES, {'testland': after}):
+            clear_holiday_cache()
+            self.assertEqual(get_holidays('Testland', 2025), {(1, 1), (4, 1)})
+
+
+class TestHolidayRecords(unittest.TestCase):
+    """
+    Unit tests for the named holiday records.
+    """
+
+    def test_records_match_get_holidays(self):
+        """Test that the records have exactly the dates of get_holidays."""
+        records = get_holiday_records('Japan', 1900, 2200)
+        by_year = {}
+        for holiday in records:
+            date = holiday.date
+            by_year.setdefault(date.year, set()).add((date.month, date.day))
+        for year in range(1900, 2201):
+            self.assertEqual(by_year.get(year, set()), get_holidays('Japan', year), year)
+
+    def test_names_and_kinds(self):
+        """Test the name and kind of rule, substitute and citizens' holidays."""
+        records = get_holiday_records('Japan', 2009, 2009)
+        holidays = {holiday.date: holiday for holiday in records}
+        self.assertEqual(holidays[datetime.date(2009, 1, 1)],
+                         Holiday(datetime.date(2009, 1, 1).toordinal(), "New Year's Day", FIXED))
+        self.assertEqual(holidays[datetime.date(2009, 1, 12)].kind, VARIABLE)
+        self.assertEqual(holidays[datetime.date(2009, 5, 6)].kind, SUBSTITUTE)
+        self.assertEqual(holidays[datetime.date(2009, 9, 22)].name, "Citizens' Holiday")
+        self.assertEqual(holidays[datetime.date(2009, 9, 22)].kind, CITIZENS)
+        self.assertEqual(repr(holidays[datetime.date(2009, 9, 23)]),
+                         "Holiday(2009-09-23, 'Autumnal Equinox Day', 'variable')")
+
+    def test_compact_storage(self):
+        """Test that a century takes five bytes per holiday and shares its names."""
+        records = get_holiday_records('Japan', 1950, 2049)
+        self.assertEqual(records.nbytes, 5 * len(records))
+        self.assertLess(records.nbytes, 8 * 1024)
+        self.assertEqual(len(records.names), len(set(records.names)))
+        first, second = [holiday for holiday in records if holiday.name == "Children's Day"][:2]
+        self.assertIs(first.name, second.name)
+        with self.assertRaises(AttributeError):
+            first.note = "slots only"
+
+    def test_between_and_unknown_country(self):
+        """Test date range queries and a country without rules."""
+        records = get_holiday_records('Japan', 2020, 2021)
+        self.assertEqual([holiday.name for holiday in records.between(
+            datetime.date(2020, 7, 23), datetime.date(2020, 7, 24))], ["Marine Day", "Sports Day"])
+        self.assertEqual(records.between(datetime.date(2020, 1, 2), datetime.date(2020, 1, 1)), [])
+        self.assertEqual(len(get_holiday_records('Atlantis', 2020, 2021)), 0)
+
+
+class TestEquinoxTable(unittest.TestCase):
+    """
+    Unit tests for the precomputed equinox table.
+    """
+
+    def test_table_matches_formula(self):
+        """Test the table against the formula wherever both are defined."""
+        for month in (3, 9):
+            differences = [year for year in range(EQUINOX_TABLE_START, EQUINOX_TABLE_END + 1)
+                           if equinox_formula_day(month, year) not in (None,
+                                                                      equinox_day(month, year))]
+            # Equinoxes within minutes of midnight
+            self.assertEqual(differences, [] if month == 3 else [1917, 2107])
+
+    def test_years_outside_table(self):
+        """Test that years outside the table have no equinox day."""
+        self.assertEqual(equinox_day(3, EQUINOX_TABLE_END), 21)
+        self.assertIsNone(equinox_day(3, EQUINOX_TABLE_START - 1))
+        self.assertIsNone(equinox_day(9, EQUINOX_TABLE_END + 1))
+
+
+class TestHolidayCache(unittest.TestCase):
+    """
+    Unit tests for the holiday cache.
+    """
+
+    def setUp(self):
+        clear_holiday_cache()
+
+    def test_cache_hits_and_misses(self):
+        """
+        Test that repeated lookups are served from the cache.
+        """
+        first = get_holidays('Japan', 2024)
+        second = get_holidays('japan', 2024)
+        self.assertIs(first, second)
+
+        # One miss of the per-year cache and one of the block cache
+        info = holiday_cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 1)
+
+    def test_cached_set_is_immutable(self):
+        """
+        Test that callers cannot corrupt the shared cached set.
+        """
+        holidays_2024 = get_holidays('Japan', 2024)
+        with self.assertRaises(AttributeError):
+            holidays_2024.add((6, 1))  # pylint: disable=no-member
+
+    def test_years_outside_date_range(self):
+        """
+        Test that years datetime cannot represent have no holidays.
+        """
+        # Year 0 used to index the end of the block of years 1-7
+        self.assertTrue(get_holidays('Japan', 7))
+        for year in (0, -1, datetime.MAXYEAR + 1):
+            self.assertEqual(get_holidays('Japan', year), frozenset(), year)
+
+
+class TestHolidaysRange(unittest.TestCase):
+    """
+    Unit tests for the multi-year holiday computation.
+    """
+
+    def test_range_matches_per_year_holidays(self):
+        """
+        Test that the batched span agrees with get_holidays for every year.
+        """
+        expected = sorted(datetime.date(year, month, day).toordinal()
+                          for year in range(1955, 2100)
+                          for month, day in get_holidays('Japan', year))
+        self.assertEqual(list(get_holidays_range('Japan', 1955, 2099)), expected)
+
+    def test_range_without_numpy(self):
+        """
+        Test the array('i') fallback used when NumPy is not installed.
+        """
+        with mock.patch('hcal_holidays.import_numpy', return_value=None):
+            ordinals = get_holidays_range('Japan', 2020, 2020)
+        self.assertIsInstance(ordinals, array)
+        self.assertIn(datetime.date(2020, 5, 6).toordinal(), ordinals)
+        self.assertEqual(len(ordinals), len(get_holidays('Japan', 2020)))
+
+    def test_range_unknown_country(self):
+        """
+        Test that unsupported countries yield no holidays.
+        """
+        self.assertEqual(len(get_holidays_range('Atlantis', 2000, 2010)), 0)
+
+
+class TestHolidayIndex(unittest.TestCase):
+    """
+    Unit tests for the HolidayIndex date queries.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = HolidayIndex('Japan', 2000, 2030)
+
+    def test_is_holiday(self):
+        """
+        Test single-date lookups, including substitute holidays.
+        """
+        self.assertTrue(self.index.is_holiday(datetime.date(2024, 1, 1)))
+        self.assertTrue(self.index.is_holiday(datetime.date(2024, 2, 12)))
+        self.assertFalse(self.index.is_holiday(datetime.date(2024, 2, 13)))
+
+    def test_holidays_between(self):
+        """
+        Test range queries against the Golden Week of 2020.
+        """
+        golden_week = self.index.holidays_between(datetime.date(2020, 5, 1),
+                                                  datetime.date(2020, 5, 10))
+        self.assertEqual(golden_week, [datetime.date(2020, 5, day) for day in (3, 4, 5, 6)])
+        self.assertEqual(self.index.count_between(datetime.date(2020, 5, 1),
+                                                  datetime.date(2020, 5, 10)), 4)
+
+    def test_counts_match_get_holidays(self):
+        """
+        Test that yearly counts agree with get_holidays.
+        """
+        for year in (2000, 2019, 2030):
+            self.assertEqual(self.index.count_between(datetime.date(year, 1, 1),
+                                                      datetime.date(year, 12, 31)),
+                             len(get_holidays('Japan', year)))
+
+    def test_empty_and_out_of_range_queries(self):
+        """
+        Test reversed ranges and dates outside the index.
+        """
+        self.assertEqual(self.index.count_between(datetime.date(2024, 12, 31),
+                                                  datetime.date(2024, 1, 1)), 0)
+        with self.assertRaises(ValueError):
+            self.index.is_holiday(datetime.date(1999, 12, 31))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the HTML renderer.
+"""
+import calendar
+import datetime
+import unittest
+
+import hcal_html
+from hcal_cli import render
+from hcal_html import HtmlCalendar, month_template
+
+TODAY = datetime.date(2024, 5, 15)
+
+
+class TestHtmlCalendar(unittest.TestCase):
+    """Test cases for HtmlCalendar."""
+
+    def test_month_classes(self):
+        """Test the weekend, holiday and today classes of the cells."""
+        cal = HtmlCalendar(calendar.SUNDAY, today=TODAY, country='Japan')
+        markup = cal.formatmonth_html(2024, 5)
+        self.assertTrue(markup.startswith('<table class="month"><caption>May 2024</caption>'))
+        self.assertIn('<th class="sun">Su</th><th>Mo</th>', markup)
+        self.assertIn('<td class="day sat holiday">4</td>', markup)
+        self.assertIn('<td class="day holiday">6</td>', markup)  # Substitute holiday
+        self.assertIn('<td class="day today">15</td>', markup)
+        self.assertIn('<td class="day sun">12</td>', markup)
+        self.assertIn('<td class="day">7</td>', markup)
+        # May 2024 starts on a Wednesday
+        self.assertIn('<tbody><tr><td></td><td></td><td></td><td class="day">1</td>', markup)
+        self.assertEqual(markup.count('<tr>'), 6)
+
+    def test_julian_days(self):
+        """Test that Julian days label the cells with the day of the year."""
+        cal = HtmlCalendar(calendar.SUNDAY, today=TODAY, country='Japan', julian=True,
+                           highlight_today=False)
+        markup = cal.formatmonth_html(2024, 3)
+        self.assertIn('<th class="sun">Sun</th>', markup)
+        self.assertIn('<td class="day">61</td>', markup)  # March 1 of a leap year
+        self.assertIn('<td class="day holiday">80</td>', markup)  # Vernal Equinox Day
+        self.assertNotIn('today', markup)
+
+    def test_templates_are_shared(self):
+        """Test that months with the same layout reuse one compiled template."""
+        month_template.cache_clear()
+        cal = HtmlCalendar(calendar.SUNDAY, today=TODAY)
+        # January and July 2024 both have 31 days starting on a Monday
+        cal.formatmonth_html(2024, 1)
+        cal.formatmonth_html(2024, 7)
+        info = month_template.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_template_escapes_labels(self):
+        """Test that braces in labels cannot break the template."""
+        template = month_template(calendar.SUNDAY, 0, 28, None, ('{x}',) * 7)
+        self.assertIn('{x}', template.format(*[''] * 28, title='T'))
+
+
+class TestHtmlFormatOption(unittest.TestCase):
+    """Test cases for hcal --format html."""
+
+    def test_year_page(self):
+        """Test a year page: one stylesheet, a year header and twelve months."""
+        output = render(["--format", "html", "-y", "2024"], today=TODAY,
+                        config={'country': 'Japan', 'holiday_color': 'blue'})
+        self.assertTrue(output.startswith('<!DOCTYPE html>'))
+        self.assertEqual(output.count('<style>'), 1)
+        self.assertIn(hcal_html.STYLESHEET, output)
+        self.assertIn('--hcal-holiday: blue;', output)
+        self.assertIn('<h2>2024</h2>', output)
+        self.assertEqual(output.count('<table class="month">'), 12)
+        self.assertTrue(output.endswith('</body></html>\n'))
+
+    def test_month_selection(self):
+        """Test that -3 selects the same months as the text calendar."""
+        output = render(["--format", "html", "-3", "1", "2024"], today=TODAY)
+        self.assertNotIn('<h2>', output)
+        for title in ('December 2023', 'January 2024', 'February 2024'):
+            self.assertIn(f'<caption>{title}</caption>', output)
+        self.assertEqual(output.count('<section class="year">'), 2)
+
+    def test_unknown_color_falls_back(self):
+        """Test that an unknown holiday_color never reaches the stylesheet."""
+        output = render(["--format", "html", "5", "2024"], today=TODAY,
+                        config={'holiday_color': 'red;}body{display:none'})
+        self.assertIn('--hcal-holiday: red;', output)
+        self.assertNotIn('display:none', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
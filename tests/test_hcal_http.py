@@ -0,0 +1,197 @@
+"""
+Tests for the hcal HTTP service.
+"""
+import datetime
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import hcal_cli
+import hcal_http
+from hcal_http import HttpServer, HttpState, etag_matches, make_etag, max_age
+
+NOW = datetime.datetime(2024, 5, 15, 12, 0)
+
+
+class TestHcalHttp(unittest.TestCase):
+    """Test cases for serving renders over HTTP."""
+
+    def setUp(self):
+        """Start a server on an ephemeral port with a temporary config."""
+        self.test_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.test_dir, "hcalrc")
+        self.write_config("country=Japan\n")
+        self.now = NOW
+        self.state = HttpState(self.config_path)
+        self.state.clock = lambda: self.now
+        self.server = HttpServer(('127.0.0.1', 0), self.state)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.quiet = mock.patch('http.server.BaseHTTPRequestHandler.log_message')
+        self.quiet.start()
+
+    def tearDown(self):
+        """Stop the server and remove the temporary directory."""
+        self.quiet.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.test_dir)
+
+    def write_config(self, text):
+        """Writes the config file watched by the server, with a new mtime."""
+        with open(self.config_path, "w", encoding="utf-8") as config_file:
+            config_file.write(text)
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def get(self, path, method='GET', **headers):
+        """Requests path, returning (status, headers, body)."""
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.server_port)
+        try:
+            connection.request(method, path, headers=headers)
+            response = connection.getresponse()
+            return response.status, response, response.read()
+        finally:
+            connection.close()
+
+    def test_month_matches_cli(self):
+        """Test that a month is rendered as the command line would."""
+        status, response, body = self.get('/month/2024/5?julian=1')
+        self.assertEqual(status, 200)
+        self.assertEqual(body.decode('utf-8'),
+                         hcal_cli.render(["-j", "5", "2024"], today=NOW.date(),
+                                         config={'country': 'Japan'}))
+        self.assertEqual(response.getheader('Content-Type'), 'text/plain; charset=utf-8')
+        self.assertEqual(response.getheader('Cache-Control'), 'max-age=3600')
+        self.assertTrue(response.getheader('ETag').startswith('"'))
+
+    def test_conditional_request_skips_rendering(self):
+        """Test that a matching If-None-Match is answered with 304 without rendering."""
+        _, response, _ = self.get('/year/2024')
+        etag = response.getheader('ETag')
+        with mock.patch('hcal_cli.run') as run:
+            status, response, body = self.get('/year/2024', **{'If-None-Match': f'W/"x", {etag}'})
+            run.assert_not_called()
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+        self.assertEqual(response.getheader('ETag'), etag)
+
+    def test_etags_follow_date_and_config(self):
+        """Test that only selections showing today change with the date, and all with the config."""
+        month = self.get('/month/2024/5')[1].getheader('ETag')
+        other = self.get('/month/2024/8')[1].getheader('ETag')
+        self.now = NOW + datetime.timedelta(days=1)
+        self.assertNotEqual(self.get('/month/2024/5')[1].getheader('ETag'), month)
+        self.assertEqual(self.get('/month/2024/8')[1].getheader('ETag'), other)
+        self.write_config("country=Japan\nholiday_color=blue\n")
+        self.assertNotEqual(self.get('/month/2024/8')[1].getheader('ETag'), other)
+
+    def test_calendars_shared_across_connections(self):
+        """Test that warm calendars are reused by later connections until the config changes."""
+        seen = []
+        run = hcal_cli.run
+
+        def record_run(args, config, now, out, calendars=None):
+            seen.append(calendars)
+            run(args, config, now, out, calendars)
+
+        with mock.patch('hcal_cli.run', record_run):
+            self.get('/month/2024/5')
+            self.get('/month/2024/6')
+            self.write_config("country=Japan\nholiday_color=blue\n")
+            self.get('/month/2024/7')
+        self.assertIs(seen[0], seen[1])
+        self.assertTrue(seen[1])
+        self.assertIsNot(seen[2], seen[0])
+
+    def test_formats(self):
+        """Test JSON records, HTML renders and holiday queries."""
+        status, response, body = self.get('/range/2024/5?after=1&before=1&format=json')
+        self.assertEqual(status, 200)
+        self.assertEqual(response.getheader('Content-Type'), 'application/json')
+        records = json.loads(body)
+        self.assertEqual((records[0]['date'], records[-1]['date']), ('2024-04-01', '2024-06-30'))
+
+        status, response, body = self.get('/year/2024?format=html')
+        self.assertEqual(response.getheader('Content-Type'), 'text/html; charset=utf-8')
+        self.assertIn(b'<!DOCTYPE html>', body)
+        self.assertEqual(body.count(b'<table class="month">'), 12)
+        self.assertIn(b'<td class="day today">15</td>', self.get('/month/2024/5?format=html')[2])
+
+        status, _, body = self.get('/holidays/2024')
+        holidays = json.loads(body)
+        self.assertEqual(holidays[0], {'date': '2024-01-01', 'name': "New Year's Day",
+                                       'kind': 'fixed'})
+        status, _, body = self.get('/holidays/2024/2025?format=text&country=Japan')
+        self.assertEqual(status, 200)
+        self.assertIn(b"2025-01-01  Wed  New Year's Day\n", body)
+
+    def test_head(self):
+        """Test that HEAD sends the headers of GET without the body."""
+        status, response, body = self.get('/month/2024/5', method='HEAD')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'')
+        self.assertGreater(int(response.getheader('Content-Length')), 0)
+
+    def test_errors(self):
+        """Test that unknown paths and invalid parameters are rejected."""
+        for path, expected in (('/', 404), ('/month/2024', 404), ('/month/2024/13', 400),
+                               ('/range/2024/1?after=-1', 400), ('/year/2024?format=pdf', 400),
+                               ('/holidays/2000/1000', 400), ('/range/9999/12?after=1', 400),
+                               ('/range/1/1?before=1', 400), ('/range/9999?after=1', 400)):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[0], expected)
+
+    def test_unexpected_error(self):
+        """Test that a failing render is answered with 500 and the server keeps serving."""
+        with mock.patch('hcal_cli.run', side_effect=RuntimeError("boom")):
+            status, response, body = self.get('/month/2024/5')
+        self.assertEqual(status, 500)
+        self.assertEqual(response.getheader('Content-Type'), 'text/plain; charset=utf-8')
+        self.assertEqual(body, b'internal error\n')
+        self.assertEqual(self.get('/month/2024/5')[0], 200)
+
+
+class TestHcalHttpHelpers(unittest.TestCase):
+    """Test cases for the HTTP helpers and the --http option."""
+
+    def test_etag_matches(self):
+        """Test If-None-Match lists, weak tags and the wildcard."""
+        self.assertTrue(etag_matches('"a", W/"b"', '"b"'))
+        self.assertTrue(etag_matches('*', '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches('', '"b"'))
+
+    def test_etags_survive_restarts(self):
+        """Test that another server process running the same code makes the same ETags."""
+        script = "import hcal_http; print(hcal_http.make_etag('render', ['month', '2024', '5']))"
+        source_dir = os.path.dirname(os.path.abspath(hcal_http.__file__))
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                check=True, cwd=source_dir)
+        self.assertEqual(result.stdout.strip(), make_etag('render', ['month', '2024', '5']))
+
+    def test_max_age_stops_at_midnight(self):
+        """Test that responses never stay fresh past midnight."""
+        self.assertEqual(max_age(datetime.datetime(2024, 5, 15, 23, 59, 30)), 30)
+        self.assertEqual(max_age(NOW), 3600)
+
+    def test_http_option(self):
+        """Test that --http parses HOST:PORT and cannot be rendered in-process."""
+        self.assertEqual(hcal_cli.parse_args(["--http", "127.0.0.1:8080"]).http,
+                         ('127.0.0.1', 8080))
+        with self.assertRaises(ValueError):
+            hcal_cli.render(["--http", "127.0.0.1:8080"])
+        with mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+            hcal_cli.parse_args(["--http", "8080"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the iCalendar export.
+"""
+import datetime
+import io
+import unittest
+from unittest import mock
+
+from hcal_cli import render
+from hcal_holidays import get_holidays
+from hcal_ics import escape_text, iter_ics_lines
+
+NOW = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class TestHcalIcs(unittest.TestCase):
+    """Test cases for hcal --export-ics."""
+
+    def test_events_match_holidays(self):
+        """Test that every holiday of every year becomes one all-day event."""
+        lines = list(iter_ics_lines('Japan', 2019, 2021, NOW))
+        self.assertEqual(lines[0], 'BEGIN:VCALENDAR')
+        self.assertEqual(lines[-1], 'END:VCALENDAR')
+        starts = [line.split(':')[1] for line in lines if line.startswith('DTSTART')]
+        expected = [f"{year}{month:02d}{day:02d}"
+                    for year in range(2019, 2022)
+                    for month, day in sorted(get_holidays('Japan', year))]
+        self.assertEqual(starts, expected)
+        self.assertEqual(lines.count('BEGIN:VEVENT'), len(expected))
+        self.assertIn('DTEND;VALUE=DATE:20190102', lines)
+        self.assertIn('UID:20190101-japan@hcal', lines)
+        self.assertIn('DTSTAMP:20240101T000000Z', lines)
+        self.assertIn("SUMMARY:New Year's Day", lines)
+        self.assertIn('SUMMARY:Substitute Holiday', lines)
+
+    def test_lines_are_generated_lazily(self):
+        """Test that the feed is produced year by year, with zero-padded years."""
+        lines = iter_ics_lines('Japan', 1, 9999, NOW)
+        first_event = [next(lines) for _ in range(14)]
+        self.assertIn('DTSTART;VALUE=DATE:00010115', first_event)
+
+    def test_escape_text(self):
+        """Test that TEXT special characters are escaped."""
+        self.assertEqual(escape_text('a,b;c\\d\ne'), 'a\\,b\\;c\\\\d\\ne')
+
+    def test_export_ics_option(self):
+        """Test the command line, including CRLF line endings."""
+        output = render(["--export-ics", "--from", "2024", "--to", "2025"],
+                        config={'country': 'Japan'})
+        self.assertTrue(output.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(output.endswith('END:VCALENDAR\r\n'))
+        self.assertNotIn('\n', output.replace('\r\n', ''))
+        self.assertEqual(output.count('BEGIN:VEVENT'),
+                         len(get_holidays('Japan', 2024)) + len(get_holidays('Japan', 2025)))
+
+    def test_export_ics_default_year(self):
+        """Test that the export defaults to the current year."""
+        output = render(["--export-ics"], today=datetime.date(2023, 5, 1),
+                        config={'country': 'Japan'})
+        self.assertIn('DTSTART;VALUE=DATE:20230101', output)
+        self.assertNotIn('DTSTART;VALUE=DATE:2024', output)
+
+    def test_export_ics_errors(self):
+        """Test that a missing country and an inverted range are reported."""
+        for argv, config in ((["--export-ics"], {}),
+                             (["--export-ics", "--from", "2020", "--to", "2010"],
+                              {'country': 'Japan'})):
+            stderr = io.StringIO()
+            with self.subTest(argv=argv), mock.patch('sys.stderr', stderr):
+                self.assertEqual(render(argv, config=config), "")
+                self.assertIn("hcal:", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 """
 Tests for hcal -j option (Julian days).
 """
+import datetime
 import unittest
 from hcal_test_base import HcalTestCase
+from hcal_util import julian_labels
 
 
 class TestHcalJulian(HcalTestCase):
@@ -91,5 +93,15 @@ class TestHcalJulian(HcalTestCase):
         # Dec 31 is 366
         self.assertIn("366", output)
 
+    def test_julian_labels_table(self):
+        """Test the day-of-year table against datetime for common and leap years."""
+        for year in (2023, 2024, 1900, 2000):
+            date = datetime.date(year, 1, 1)
+            while date.year == year:
+                labels = julian_labels(date.month, date.year % 4 == 0 and
+                                       (date.year % 100 != 0 or date.year % 400 == 0), 3)
+                self.assertEqual(labels[date.day], str(date.timetuple().tm_yday).rjust(3))
+                date += datetime.timedelta(days=1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,41 @@
+"""
+Tests for the --list option of hcal.
+"""
+import datetime
+import io
+import unittest
+from unittest import mock
+
+from hcal_cli import render
+
+
+class TestHcalListOption(unittest.TestCase):
+    """Test cases for hcal --list."""
+
+    def test_list_year(self):
+        """Test that every holiday is listed with its weekday and name."""
+        output = render(["--list", "2009"], config={'country': 'Japan'})
+        lines = output.splitlines()
+        self.assertEqual(len(lines), 17)
+        self.assertEqual(lines[0], "2009-01-01  Thu  New Year's Day")
+        self.assertIn("2009-05-06  Wed  Substitute Holiday", lines)
+        self.assertIn("2009-09-22  Tue  Citizens' Holiday", lines)
+
+    def test_list_default_year(self):
+        """Test that --list defaults to the current year."""
+        output = render(["--list"], today=datetime.date(2024, 5, 1),
+                        config={'country': 'Japan'})
+        self.assertTrue(output.startswith("2024-01-01  Mon  New Year's Day\n"))
+        self.assertIn("2024-02-12  Mon  Substitute Holiday\n", output)
+
+    def test_list_errors(self):
+        """Test that a missing country and an invalid year are reported."""
+        for argv, config in ((["--list"], {}), (["--list", "0"], {'country': 'Japan'})):
+            stderr = io.StringIO()
+            with self.subTest(argv=argv), mock.patch('sys.stderr', stderr):
+                self.assertEqual(render(argv, config=config), "")
+                self.assertIn("hcal:", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
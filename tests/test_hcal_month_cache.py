@@ -0,0 +1,77 @@
+"""
+Tests for the rendered month-block cache.
+"""
+import calendar
+import datetime
+import unittest
+
+from hcal_util import (DAYS_BEFORE_MONTH, HighlightCalendar, clear_month_cache,
+                       month_cache_info, strip_ansi)
+
+
+class JulianTextCalendar(calendar.TextCalendar):
+    """A calendar.TextCalendar labelling the days of a month by day of the year."""
+
+    offset = 0
+
+    def formatday(self, day, weekday, width):
+        if day == 0:
+            return ' ' * width
+        return f'{day + self.offset:>{width}}'
+
+
+class TestMonthCache(unittest.TestCase):
+    """Test cases for HighlightCalendar.month_lines."""
+
+    def setUp(self):
+        clear_month_cache()
+
+    @staticmethod
+    def render_uncached(cal, year, month):
+        """Renders a month with the standard library, as plain padded lines."""
+        if cal.julian:
+            oracle = JulianTextCalendar(cal.firstweekday)
+            oracle.offset = DAYS_BEFORE_MONTH[month] + (month > 2 and calendar.isleap(year))
+        else:
+            oracle = calendar.TextCalendar(cal.firstweekday)
+        text = oracle.formatmonth(year, month, w=cal.formatmonth_w)
+        return [line.ljust(cal.month_width) for line in text.splitlines()]
+
+    @staticmethod
+    def render_styled(cal, year, month):
+        """Renders a month through formatmonth_lines, bypassing the cache."""
+        return [line.pad(cal.month_width).render()
+                for line in cal.formatmonth_lines(year, month, w=cal.formatmonth_w)]
+
+    def test_today_overlay_matches_full_render(self):
+        """Test that the patched block equals a full render for every day."""
+        for julian in (False, True):
+            for day in range(1, 32):
+                today = datetime.date(2024, 3, day)
+                cal = HighlightCalendar(calendar.SUNDAY, today=today, country='Japan',
+                                        julian=julian)
+                lines = cal.month_lines(2024, 3)
+                self.assertEqual([strip_ansi(line) for line in lines],
+                                 self.render_uncached(cal, 2024, 3))
+                self.assertEqual(lines, self.render_styled(cal, 2024, 3))
+
+    def test_cache_shared_across_days(self):
+        """Test that calendars for different days reuse the same block."""
+        for day in (1, 15):
+            cal = HighlightCalendar(calendar.SUNDAY, today=datetime.date(2024, 5, day),
+                                    country='Japan')
+            cal.month_lines(2024, 5)
+        info = month_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_style_is_part_of_key(self):
+        """Test that different holiday colors are cached separately."""
+        red = HighlightCalendar(calendar.SUNDAY, country='Japan', holiday_color='red')
+        green = HighlightCalendar(calendar.SUNDAY, country='Japan', holiday_color='green')
+        self.assertNotEqual(red.month_lines(2024, 1), green.month_lines(2024, 1))
+        self.assertEqual(month_cache_info().misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Tests for hcal output options.
+"""
+import os
+import tempfile
+import unittest
+from tests.hcal_test_base import HcalTestCase
+
+
+class TestHcalOutput(HcalTestCase):
+    """Tests for the --output, --flush and --jobs options."""
+
+    def test_output_file_matches_stdout(self):
+        """Test that --output writes exactly what would go to stdout."""
+        expected = self.run_hcal("-y", "2024", "-A", "14").stdout
+        with tempfile.TemporaryDirectory() as test_dir:
+            path = os.path.join(test_dir, "calendar.txt")
+            result = self.run_hcal("-y", "2024", "-A", "14", "--output", path)
+            self.assertEqual(result.stdout, "")
+            with open(path, encoding="utf-8") as output_file:
+                self.assertEqual(output_file.read(), expected)
+
+    def test_flush_modes_produce_same_output(self):
+        """Test that the flush mode does not change the output."""
+        outputs = {self.run_hcal("--flush", mode, "-3", "6", "2024").stdout
+                   for mode in ("auto", "block", "end")}
+        self.assertEqual(len(outputs), 1)
+
+    def test_jobs_output_matches_serial(self):
+        """Test that rendering years in worker processes gives identical output."""
+        for args in (("-y", "2000", "-A", "30"), ("-j", "-y", "2020", "-B", "14"),
+                     ("-y", "2000", "-B", "2", "-A", "2")):
+            with self.subTest(args=args):
+                expected = self.run_hcal(*args).stdout
+                self.assertEqual(self.run_hcal("--jobs", "3", *args).stdout, expected)
+
+    def test_jobs_must_be_positive(self):
+        """Test that --jobs rejects non-positive counts."""
+        result = self.run_hcal("--jobs", "0", "-y", "2020", check=False)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("invalid positive integer", result.stderr)
+
+    def test_output_unwritable(self):
+        """Test that an unwritable output file is reported."""
+        result = self.run_hcal("--output", "/nonexistent/dir/calendar.txt", check=False)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("cannot write", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for the --profile option.
+"""
+import contextlib
+import datetime
+import io
+import os
+import pstats
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import hcal_cli
+import hcal_profile
+import hcal_util
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for hcal_profile.Profiler."""
+
+    def test_nested_phases_are_exclusive(self):
+        """Test that a nested phase pauses the enclosing one."""
+        profiler = hcal_profile.Profiler()
+        clock = iter([1.0, 2.0, 5.0, 6.0])
+        with mock.patch('time.perf_counter', lambda: next(clock)):
+            with profiler.phase('render'):
+                with profiler.phase('holidays'):
+                    pass
+        self.assertEqual(profiler.totals['render'], 2.0)
+        self.assertEqual(profiler.totals['holidays'], 3.0)
+        self.assertEqual(profiler.calls['render'], 1)
+
+    def test_instrument_restores_functions(self):
+        """Test that the wrapped functions are put back afterwards."""
+        original = hcal_util.HighlightCalendar.__dict__['formatmonth_lines']
+        profiler = hcal_profile.Profiler()
+        with profiler.instrument():
+            self.assertIsNot(hcal_util.HighlightCalendar.__dict__['formatmonth_lines'],
+                             original)
+            hcal_util.HighlightCalendar().formatmonth(2024, 1)
+        self.assertIs(hcal_util.HighlightCalendar.__dict__['formatmonth_lines'], original)
+        self.assertGreater(profiler.calls['render'], 0)
+        self.assertEqual(profiler.calls['layout'], 1)
+
+    def test_lazy_import_keeps_originals(self):
+        """Test that a module first imported while profiling does not keep the wrappers."""
+        profiler = hcal_profile.Profiler()
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop('hcal_records', None)
+            with profiler.instrument():
+                import hcal_records  # pylint: disable=import-outside-toplevel
+            calls = profiler.calls['holidays']
+            list(hcal_records.iter_day_records([(2024, 1)], 'Japan', datetime.date(2024, 1, 1)))
+        self.assertEqual(profiler.calls['holidays'], calls)
+
+
+class TestHcalProfileOption(unittest.TestCase):
+    """Test cases for hcal --profile."""
+
+    def run_main(self, *args):
+        """Runs hcal_cli.main and returns (stdout, stderr)."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr), \
+                mock.patch.dict(os.environ, {'HOME': tempfile.gettempdir()}):
+            os.environ.pop(hcal_cli.SOCKET_ENV, None)
+            hcal_cli.main(list(args))
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_profile_reports_phases(self):
+        """Test that every phase is reported on stderr and stdout is unchanged."""
+        expected, _ = self.run_main("-h", "-y", "2024")
+        output, report = self.run_main("--profile", "-h", "-y", "2024")
+        self.assertEqual(output, expected)
+        for name in hcal_profile.PHASES + ('other', 'total'):
+            self.assertIn(f"  {name}", report)
+
+    def test_profile_dump(self):
+        """Test that --profile-dump writes cProfile statistics."""
+        with tempfile.TemporaryDirectory() as test_dir:
+            path = os.path.join(test_dir, "hcal.prof")
+            _, report = self.run_main("--profile-dump", path, "-h", "1", "2024")
+            self.assertIn("hcal profile", report)
+            stats = pstats.Stats(path)
+            self.assertTrue(any(name == 'run' for _, _, name in stats.stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the machine-readable output formats.
+"""
+import csv
+import datetime
+import io
+import json
+import unittest
+
+from hcal_cli import render
+from hcal_holidays import get_holidays
+from hcal_records import FIELDS, iter_day_records
+
+TODAY = datetime.date(2024, 2, 29)
+CONFIG = {'country': 'Japan'}
+
+
+class TestHcalRecords(unittest.TestCase):
+    """Test cases for hcal --format."""
+
+    def test_records_match_datetime(self):
+        """Test every field against datetime over several years."""
+        months = [(year, month) for year in range(1999, 2002) for month in range(1, 13)]
+        records = list(iter_day_records(months, 'Japan', TODAY))
+        date = datetime.date(1999, 1, 1)
+        self.assertEqual(len(records), 365 * 2 + 366)
+        for record in records:
+            self.assertEqual(record['date'], date.isoformat())
+            self.assertEqual(record['weekday'], date.isoweekday())
+            self.assertEqual(record['julian'], date.timetuple().tm_yday)
+            self.assertEqual(record['is_weekend'], date.weekday() >= 5)
+            self.assertEqual(record['is_holiday'],
+                             (date.month, date.day) in get_holidays('Japan', date.year))
+            self.assertFalse(record['is_today'])
+            date += datetime.timedelta(days=1)
+
+    def test_jsonl(self):
+        """Test one JSON object per day of the -3 selection."""
+        output = render(["--format", "jsonl", "-3", "2", "2024"], today=TODAY, config=CONFIG)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(records), 31 + 29 + 31)
+        self.assertEqual(records[0]['date'], '2024-01-01')
+        self.assertEqual([r['date'] for r in records if r['is_today']], ['2024-02-29'])
+        self.assertEqual(list(records[0]), list(FIELDS))
+
+    def test_json(self):
+        """Test that the json format is a single array."""
+        output = render(["--format", "json", "-y", "2023", "-B", "1"], today=TODAY,
+                        config=CONFIG)
+        records = json.loads(output)
+        self.assertEqual(len(records), 31 + 365)
+        self.assertEqual(records[0]['date'], '2022-12-01')
+        self.assertEqual(records[-1]['date'], '2023-12-31')
+
+    def test_csv(self):
+        """Test the csv format, including the header and boolean values."""
+        output = render(["--format", "csv", "1", "2024"], today=TODAY, config=CONFIG)
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), 31)
+        self.assertEqual(rows[0], {'date': '2024-01-01', 'weekday': '1', 'julian': '1',
+                                   'is_weekend': 'false', 'is_holiday': 'true',
+                                   'is_today': 'false'})
+
+    def test_without_country(self):
+        """Test that no day is a holiday without a configured country."""
+        output = render(["--format", "jsonl", "1", "2024"], today=TODAY, config={})
+        self.assertFalse(any(json.loads(line)['is_holiday'] for line in output.splitlines()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the in-process render() entry point.
+"""
+import datetime
+import io
+import unittest
+
+from hcal_cli import render
+
+
+class TestHcalRender(unittest.TestCase):
+    """Test cases for hcal_cli.render."""
+
+    def test_render_returns_output(self):
+        """Test that the output is returned as a string."""
+        output = render(["1", "2024"], config={})
+        self.assertIn("January 2024", output)
+
+    def test_render_today(self):
+        """Test that today can be chosen by the caller."""
+        output = render([], today=datetime.date(2024, 2, 29), config={})
+        self.assertIn("February 2024", output)
+        self.assertIn("\033[47;30m29\033[0m", output)
+
+    def test_render_config(self):
+        """Test that the configuration can be passed in."""
+        output = render(["-h", "1", "2024"], config={'country': 'Japan',
+                                                     'holiday_color': 'green'})
+        self.assertIn("\033[32m 1\033[0m", output)
+
+    def test_render_to_stream(self):
+        """Test writing to a caller-provided stream."""
+        stream = io.StringIO()
+        self.assertIsNone(render(["-3", "6", "2024"], config={}, stream=stream))
+        self.assertEqual(stream.getvalue(), render(["-3", "6", "2024"], config={}))
+
+    def test_render_before_year_one(self):
+        """Test that months before year 1 render without holidays."""
+        config = {'country': 'Japan'}
+        self.assertIn("December -1", render(["-B", "13", "1", "1"], config=config))
+        # Saturday, January 15, 0 is not a holiday (Coming of Age Day of year 7)
+        self.assertIn("\033[34m15\033[0m", render(["-h", "1", "0"], config=config))
+
+    def test_render_rejects_serve(self):
+        """Test that the daemon cannot be started through render."""
+        with self.assertRaises(ValueError):
+            render(["--serve", "hcal.sock"])
+
+    def test_render_rejects_reports(self):
+        """Test that options reporting on the invocation are not silently ignored."""
+        for argv in (["--profile"], ["--profile-dump", "hcal.prof"], ["--stats"]):
+            with self.subTest(argv=argv), self.assertRaises(ValueError):
+                render(argv + ["1", "2024"], config={})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Tests for the Segment/Line render model.
+"""
+import calendar
+import unittest
+
+from hcal_util import HighlightCalendar, Line, Segment, strip_ansi
+
+
+class TestSegments(unittest.TestCase):
+    """Test cases for Segment and Line."""
+
+    def test_line_width_ignores_styles(self):
+        """Test that styled segments count only their visible text."""
+        line = Line([Segment(' 1', '\033[31m'), Segment(' '), Segment(' 2')])
+        self.assertEqual(line.width, 5)
+        self.assertEqual(line.render(), '\033[31m 1\033[0m  2')
+        self.assertEqual(len(strip_ansi(line.pad(20).render())), 20)
+
+    def test_rstrip_keeps_styled_segments(self):
+        """Test that rstrip only removes trailing unstyled blanks."""
+        line = Line([Segment('31', '\033[34m'), Segment(' '), Segment('  ')]).rstrip()
+        self.assertEqual(line.width, 2)
+        self.assertEqual(line.render(), '\033[34m31\033[0m')
+
+    def test_month_lines_match_text_calendar(self):
+        """Test that the visible text equals calendar.TextCalendar output."""
+        plain = calendar.TextCalendar(calendar.SUNDAY)
+        for julian in (False, True):
+            cal = HighlightCalendar(calendar.SUNDAY, country='Japan', julian=julian)
+            for month in range(1, 13):
+                lines = cal.formatmonth_lines(2024, month, w=cal.formatmonth_w)
+                expected = plain.formatmonth(2024, month, w=cal.formatmonth_w)
+                if not julian:
+                    self.assertEqual(strip_ansi(cal.formatmonth(2024, month, w=2)), expected)
+                for line in lines:
+                    self.assertEqual(line.width, len(strip_ansi(line.render())))
+                    self.assertLessEqual(line.width, cal.month_width)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Start-up regression checks for the common hcal invocations.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Cumulative import time allowed for hcal_cli on the fast path, in microseconds.
+# It is about 15ms on a typical machine; most of it is calendar importing locale.
+STARTUP_BUDGET_US = 60000
+
+# Modules the fast path must not import when no country is configured.
+DEFERRED_MODULES = {'argparse', 'numpy', 'tempfile', 'hcal_holidays',
+                    'hcal_holiday_store', 'hcal_business', 'hcal_daemon'}
+
+
+class TestHcalStartup(unittest.TestCase):
+    """Checks the imports made by hcal with python -X importtime."""
+
+    def import_times(self, *args):
+        """Runs hcal with -X importtime, returning {module: cumulative us}."""
+        with tempfile.TemporaryDirectory() as home:
+            env = dict(os.environ, HOME=home)
+            env.pop('HCAL_SOCKET', None)
+            result = subprocess.run([sys.executable, "-X", "importtime", "./hcal"] + list(args),
+                                    capture_output=True, text=True, check=True, env=env)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        return times
+
+    def test_fast_path_imports(self):
+        """Test that plain and -3 invocations skip the deferred modules."""
+        for args in ((), ("-3",)):
+            times = self.import_times(*args)
+            self.assertIn('hcal_cli', times)
+            self.assertEqual(DEFERRED_MODULES & set(times), set(), args)
+
+    def test_fast_path_budget(self):
+        """Test that importing hcal stays within the start-up budget."""
+        times = self.import_times("-3")
+        self.assertLess(times['hcal_cli'], STARTUP_BUDGET_US)
+
+    def test_full_parser_still_used(self):
+        """Test that other arguments go through argparse."""
+        times = self.import_times("-y", "2024")
+        self.assertIn('argparse', times)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests for the --stats option and the HCAL_STATS_LOG log file.
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import hcal_cli
+import hcal_holidays
+import hcal_stats
+import hcal_util
+
+
+class TestHcalStats(unittest.TestCase):
+    """Test cases for hcal --stats."""
+
+    def setUp(self):
+        hcal_holidays.clear_holiday_cache()
+        hcal_util.clear_month_cache()
+
+    def run_main(self, *args, environ=None):
+        """Runs hcal_cli.main with a country configured and returns (stdout, stderr)."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with tempfile.TemporaryDirectory() as home:
+            with open(os.path.join(home, ".hcalrc"), "w", encoding="utf-8") as config:
+                config.write("country=Japan\n")
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr), \
+                    mock.patch.dict(os.environ, {'HOME': home, **(environ or {})}):
+                os.environ.pop(hcal_cli.SOCKET_ENV, None)
+                if not environ:
+                    os.environ.pop(hcal_cli.STATS_LOG_ENV, None)
+                hcal_cli.main(list(args))
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_stats_counts_work(self):
+        """Test the counters of a multi-year render."""
+        output, report = self.run_main("--stats", "-h", "-y", "2024", "-A", "12")
+        counters = json.loads(report)
+        self.assertEqual(list(counters), list(hcal_stats.snapshot()))
+        self.assertEqual(counters['month_cache_misses'], 24)
+        self.assertEqual(counters['holiday_lookups'], 24)
+        self.assertEqual(counters['holiday_computations'], 2)
+        # 22 hits of the per-year cache, one of the block cache (2024 and 2025
+        # share a block)
+        self.assertEqual(counters['holiday_cache_hits'], 23)
+        self.assertEqual(counters['holiday_cache_misses'], 3)
+        self.assertGreater(counters['cells_formatted'], 24 * 28)
+        self.assertEqual(counters['bytes_written'], len(output.encode('utf-8')))
+
+    def test_stats_log(self):
+        """Test that HCAL_STATS_LOG appends one JSON line per invocation."""
+        with tempfile.TemporaryDirectory() as test_dir:
+            path = os.path.join(test_dir, "stats.log")
+            environ = {hcal_cli.STATS_LOG_ENV: path}
+            _, report = self.run_main("1", "2024", environ=environ)
+            self.assertEqual(report, "")
+            self.run_main("-3", "1", "2024", environ=environ)
+            with open(path, encoding="utf-8") as log_file:
+                records = [json.loads(line) for line in log_file]
+        self.assertEqual([record['argv'] for record in records],
+                         [["1", "2024"], ["-3", "1", "2024"]])
+        self.assertEqual(records[0]['holiday_lookups'], 1)
+        self.assertIn('time', records[1])
+
+    def test_stats_include_workers(self):
+        """Test that --jobs reports the work of its worker processes."""
+        _, report = self.run_main("--stats", "-h", "-y", "2020", "-A", "3")
+        serial = json.loads(report)
+        hcal_holidays.clear_holiday_cache()
+        hcal_util.clear_month_cache()
+        _, report = self.run_main("--stats", "--jobs", "2", "-h", "-y", "2020", "-A", "3")
+        parallel = json.loads(report)
+        for name in ('cells_formatted', 'month_cache_misses', 'holiday_lookups',
+                     'lines_padded', 'bytes_written'):
+            self.assertEqual(parallel[name], serial[name], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,18 @@ class TestHcalVernalEquinoxDay(unittest.TestCase):
         holidays_2025 = get_holidays('Japan', 2025)
         self.assertIn((3, 20), holidays_2025)
 
+    def test_vernal_equinox_after_2099(self):
+        """Test dates from the precomputed table after 2099."""
+        # 2100: March 20
+        self.assertIn((3, 20), get_holidays('Japan', 2100))
+
+        # 2150: March 21
+        self.assertIn((3, 21), get_holidays('Japan', 2150))
+
+        # 2300 is the last year of the table
+        self.assertIn((3, 21), get_holidays('Japan', 2300))
+        self.assertFalse({(3, 19), (3, 20), (3, 21), (3, 22)} & get_holidays('Japan', 2301))
+
     def test_vernal_equinox_pre_1955(self):
         """Test dates before 1955 (should be None/not present)."""
         # Should not be present before 1955